@@ -0,0 +1,75 @@
+"""Latencia de agregación por recarga: group-bys de pandas contra el cubo.
+
+Uso: python benchmarks/bench_cube.py --entities 2500 --repeat 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.cube import PopulationCube  # noqa: E402
+from utils.data_processing import interpolate_years  # noqa: E402
+from synthetic import BASE_STATES, make_long_frame  # noqa: E402
+
+
+def pandas_rerun(df, year):
+    """Agregaciones que hacían las gráficas con groupby en cada recarga."""
+    df_year = df[df['Año'] == year]
+    df_year.groupby(['Género', 'Grupo quinquenal de edad'])['Cantidad'].sum()
+    df.groupby(['Año', 'Género'])['Cantidad'].sum()
+    df.groupby('Entidad federativa')['Cantidad'].sum().sort_values(ascending=False)
+    df.groupby(['Entidad federativa', 'Género'])['Cantidad'].sum().unstack().fillna(0)
+    df_year.groupby('Género')['Cantidad'].sum()
+    df.groupby('Año')['Cantidad'].sum()
+
+
+def cube_rerun(cube, year):
+    """Las mismas agregaciones respondidas por el cubo."""
+    cube_year = cube.select(years=[year])
+    cube_year.rollup(['Género', 'Grupo quinquenal de edad'])
+    cube.rollup(['Año', 'Género'])
+    cube.rollup(['Entidad federativa']).sort_values('Cantidad', ascending=False)
+    cube.rollup(['Entidad federativa', 'Género']).pivot(
+        index='Entidad federativa', columns='Género', values='Cantidad')
+    cube_year.rollup(['Género'])
+    cube.rollup(['Año'])
+
+
+def best_of(func, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=2500,
+                        help="Número aproximado de entidades (municipios)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scale = max(1, round(args.entities / BASE_STATES))
+    df = interpolate_years(make_long_frame(scale))
+    year = int(df['Año'].max())
+
+    start = time.perf_counter()
+    cube = PopulationCube.from_frame(df)
+    build_time = time.perf_counter() - start
+
+    before = best_of(pandas_rerun, df, year, repeat=args.repeat)
+    after = best_of(cube_rerun, cube, year, repeat=args.repeat)
+
+    print(f"filas: {len(df):,}  entidades: {BASE_STATES * scale:,}")
+    print(f"construcción del cubo (una vez): {build_time * 1000:8.1f} ms")
+    print(f"recarga con groupby:             {before * 1000:8.1f} ms")
+    print(f"recarga con el cubo:             {after * 1000:8.1f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
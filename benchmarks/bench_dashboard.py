@@ -0,0 +1,205 @@
+"""Banco de pruebas sin servidor del ETL, la carga y cada gráfica del dashboard.
+
+Corre con datos sintéticos a varias escalas, con Streamlit sustituido por
+`st_stub.StreamlitStub` y matplotlib en modo Agg. Para cada etapa reporta el
+mejor tiempo de `--repeat` corridas, la memoria máxima (tracemalloc, en una
+corrida aparte para no distorsionar el tiempo) y el desglose por sub-etapa
+que registra `utils.instrumentation` en la última corrida. Las gráficas se
+miden en frío: las cachés de renderizado y de agregaciones se vacían antes de
+cada corrida.
+
+Los resultados se guardan en JSON; con `--compare` se contrastan contra un
+JSON anterior (p. ej. de otro commit) y se marcan las regresiones.
+
+Uso: python benchmarks/bench_dashboard.py --scales 1 10 --output actual.json
+     python benchmarks/bench_dashboard.py --compare base.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import utils.visualization as visualization  # noqa: E402
+from utils.data_processing import (  # noqa: E402
+    clean_raw, reshape_long, clean_text_columns, interpolate_years, transform_data
+)
+from utils.data_service import DataSnapshot  # noqa: E402
+from utils import instrumentation  # noqa: E402
+from utils.precompute import aggregate_cache  # noqa: E402
+from utils.render_cache import render_cache  # noqa: E402
+from utils.schema import enforce_schema  # noqa: E402
+from utils.storage import load_processed, load_table, save_processed  # noqa: E402
+from utils.validation import validate_raw  # noqa: E402
+from st_stub import StreamlitStub  # noqa: E402
+from synthetic import make_raw_frame  # noqa: E402
+
+PLOTS = [
+    'plot_population_by_gender_age',
+    'plot_population_trend',
+    'plot_population_by_state',
+    'plot_population_scatter',
+    'plot_population_pie',
+    'forecast_population_quinquenal',
+]
+REGRESSION_RATIO = 1.2
+
+
+def quiet(func, *args, **kwargs):
+    """Llama a `func` descartando lo que imprime."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def run_stage(func, repeat, before=None):
+    """Mejor tiempo de `repeat` corridas, memoria máxima en MiB, desglose y resultado."""
+    best = float('inf')
+    for i in range(repeat):
+        if before:
+            before()
+        instrumentation.begin_run(i == repeat - 1)
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        breakdown = instrumentation.end_run()
+
+    if before:
+        before()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20, breakdown, result
+
+
+def bench_scale(scale, repeat, backends, tmp):
+    """Mide todas las etapas a una escala; regresa una lista de registros."""
+    records = []
+
+    def record(stage, func, before=None, **extra):
+        seconds, peak, breakdown, result = run_stage(func, repeat, before)
+        entry = {'scale': scale, 'stage': stage, 'seconds': seconds, 'peak_mib': peak,
+                 'breakdown': breakdown}
+        if isinstance(result, pd.DataFrame):
+            entry['rows'] = len(result)
+        entry.update({name: value() for name, value in extra.items()})
+        records.append(entry)
+        print(f"{scale:>6} {stage:<48} {seconds * 1000:10.1f} {peak:9.1f}")
+        for part in breakdown:
+            if part['depth']:
+                print(f"{'':>6}   {'· ' * part['depth'] + part['stage'].rsplit('/', 1)[-1]:<46} "
+                      f"{part['seconds'] * 1000:10.1f}")
+        return result
+
+    raw_path, out_path = tmp / f"raw_{scale}.xlsx", tmp / f"processed_{scale}.parquet"
+    make_raw_frame(scale).to_excel(raw_path, index=False)
+
+    # ETL completo y desglosado en las mismas etapas que `transform_data`
+    record('etl.transform_data', lambda: quiet(transform_data, raw_path, out_path))
+    raw = record('etl.read_excel', lambda: pd.read_excel(raw_path))
+    valid = record('etl.validate', lambda: validate_raw(raw)[0])
+    long = record('etl.reshape', lambda: clean_text_columns(reshape_long(clean_raw(valid))))
+    final = record('etl.interpolate', lambda: enforce_schema(interpolate_years(long)))
+    record('etl.save', lambda: save_processed(final, out_path))
+
+    # Carga: marco pandas y versión compartida (tabla Arrow + cubo + índice)
+    record('load.load_processed', lambda: load_processed(out_path))
+    snapshot = record('load.snapshot', lambda: DataSnapshot(scale, load_table(out_path)))
+
+    stub = StreamlitStub()
+    visualization.st = stub
+
+    def cold():
+        render_cache.clear()
+        aggregate_cache.clear()
+        stub.reset()
+
+    for backend in backends:
+        for name in PLOTS:
+            plot = getattr(visualization, name)
+            record(f"plot.{name}[{backend}]",
+                   lambda: plot(snapshot.cube, key_suffix="bench", backend=backend),
+                   before=cold,
+                   payload_bytes=lambda: stub.payload_bytes,
+                   messages=lambda: list(stub.messages))
+    return records
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def compare(previous, current):
+    """Imprime la razón de tiempos actual/anterior por (escala, etapa)."""
+    before = {(r['scale'], r['stage']): r for r in previous['results']}
+    print(f"\nComparación contra {previous['meta'].get('commit') or 'resultado anterior'}")
+    print(f"{'escala':>6} {'etapa':<48} {'antes (ms)':>11} {'ahora (ms)':>11} {'razón':>7}")
+    regressions = 0
+    for r in current['results']:
+        old = before.get((r['scale'], r['stage']))
+        if old is None:
+            continue
+        ratio = r['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        flag = ' ⚠' if ratio > REGRESSION_RATIO else ''
+        regressions += bool(flag)
+        print(f"{r['scale']:>6} {r['stage']:<48} {old['seconds'] * 1000:11.1f} "
+              f"{r['seconds'] * 1000:11.1f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(visualization.available_backends()))
+    parser.add_argument("--output", default="bench_dashboard.json")
+    parser.add_argument("--compare", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    print(f"{'escala':>6} {'etapa':<48} {'tiempo (ms)':>10} {'MiB máx':>9}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            results.extend(bench_scale(scale, args.repeat, args.backends, Path(tmp)))
+
+    report = {'meta': metadata(), 'results': results}
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\nResultados guardados en {args.output}")
+
+    errors = [(r['stage'], m) for r in results for kind, m in r.get('messages', []) if kind == 'error']
+    for stage, message in errors:
+        print(f"  ✗ {stage}: {message}")
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), report)
+        if regressions:
+            print(f"\n{regressions} etapa(s) más de {REGRESSION_RATIO:.1f}x más lentas")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Costo por llamada de `utils.instrumentation` desactivada y activada.
+
+Uso: python benchmarks/bench_instrumentation.py --calls 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils import instrumentation  # noqa: E402
+from utils.instrumentation import stage, timed  # noqa: E402
+
+
+def plain():
+    return None
+
+
+decorated = timed('bench.decorated')(plain)
+
+
+def with_stage():
+    with stage('bench.stage'):
+        return None
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base = per_call_ns(plain, args.calls)
+    print(f"{'modo':<12} {'forma':<12} {'ns/llamada':>11} {'sobrecosto (ns)':>16}")
+    for enabled in (False, True):
+        instrumentation.enable(enabled)
+        for label, func in (('decorador', decorated), ('contexto', with_stage)):
+            cost = per_call_ns(func, args.calls)
+            print(f"{'activada' if enabled else 'desactivada':<12} {label:<12} {cost:11.0f} {cost - base:16.0f}")
+        instrumentation.reset_totals()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compara la interpolación por grupo original contra `interpolate_years`.
+
+La igualdad se revisa con los años por omisión de los datos sintéticos y
+con un conjunto disperso (sólo 2010 y 2020), donde el paso entre años no se
+puede deducir de los datos.
+
+Uso: python benchmarks/bench_interpolation.py --scales 10 100 1000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.data_processing import interpolate_years, KEY_COLUMNS  # noqa: E402
+from synthetic import make_long_frame, CENSUS_YEARS  # noqa: E402
+
+YEAR_SETS = {'censos': CENSUS_YEARS, 'disperso': [2010, 2020]}
+
+
+def legacy_interpolate(df_final):
+    """Implementación original con groupby.apply (sólo para comparar)."""
+    df_final = df_final.set_index(KEY_COLUMNS)
+
+    def interpolar(grupo):
+        if 2015 not in grupo['Año'].values:
+            año_2010 = grupo[grupo['Año'] == 2010].iloc[0]
+            año_2020 = grupo[grupo['Año'] == 2020].iloc[0]
+
+            cantidad_2010 = año_2010['Cantidad']
+            cantidad_2020 = año_2020['Cantidad']
+
+            cantidad_2015 = cantidad_2010 + (cantidad_2020 - cantidad_2010) * (2015 - 2010) / (2020 - 2010)
+
+            nueva_fila = año_2010.copy()
+            nueva_fila['Año'] = 2015
+            nueva_fila['Cantidad'] = int(round(cantidad_2015))
+
+            grupo = pd.concat([grupo, pd.DataFrame([nueva_fila])], ignore_index=True)
+            grupo = grupo.sort_values('Año')
+        return grupo
+
+    df_final = df_final.groupby(level=[0, 1, 2]).apply(interpolar).reset_index(level=[0, 1, 2])
+    return df_final.reset_index(drop=True)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--legacy-max-scale", type=int, default=10,
+                        help="Escala máxima a la que se ejecuta la versión original")
+    args = parser.parse_args()
+
+    print(f"{'escala':>8} {'años':>9} {'filas':>12} {'original (s)':>14} "
+          f"{'vectorizada (s)':>16} {'aceleración':>12}")
+    for scale in args.scales:
+        for name, years in YEAR_SETS.items():
+            df = make_long_frame(scale, years=years)
+            new, new_time = timed(interpolate_years, df)
+
+            if scale <= args.legacy_max_scale:
+                old, old_time = timed(legacy_interpolate, df)
+                old['Cantidad'] = old['Cantidad'].astype('int64')
+                pd.testing.assert_frame_equal(old, new, check_dtype=False)
+                old_col, speedup = f"{old_time:14.3f}", f"{old_time / new_time:11.1f}x"
+            else:
+                old_col, speedup = f"{'-':>14}", f"{'-':>12}"
+
+            print(f"{scale:>8} {name:>9} {len(new):>12,} {old_col} {new_time:16.3f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Gráficas por entidad y de dispersión con y sin nivel de detalle a muchas entidades.
+
+Para cada escala dibuja `plot_population_by_state` y `plot_population_scatter`
+en ambos motores con los límites de `utils.level_of_detail` (ventana del
+ranking más 'Otras', dispersión agrupada en celdas) y sin ellos (límites
+fuera de alcance: una barra y un punto por entidad). Las cachés se limpian
+antes de cada gráfica, así que se mide el primer dibujo. Reporta tiempo y
+bytes enviados al navegador.
+
+Uso: python benchmarks/bench_lod.py --scales 1 10 80
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import utils.level_of_detail as lod  # noqa: E402
+import utils.visualization as visualization  # noqa: E402
+from utils.cube import PopulationCube  # noqa: E402
+from utils.data_processing import interpolate_years  # noqa: E402
+from utils.precompute import aggregate_cache  # noqa: E402
+from utils.render_cache import render_cache  # noqa: E402
+from utils.schema import STATE  # noqa: E402
+from st_stub import StreamlitStub  # noqa: E402
+from synthetic import make_long_frame  # noqa: E402
+
+CHARTS = ('plot_population_by_state', 'plot_population_scatter')
+BACKENDS = ('matplotlib', 'vega')
+
+
+def render(st, cube, chart, backend):
+    """Tiempo (ms) y bytes de una gráfica dibujada en frío."""
+    render_cache.clear()
+    aggregate_cache.clear()
+    st.reset()
+    start = time.perf_counter()
+    getattr(visualization, chart)(cube, key_suffix='bench', backend=backend)
+    elapsed = (time.perf_counter() - start) * 1000
+    if st.messages:
+        raise RuntimeError(f"{chart} ({backend}): {st.messages}")
+    return elapsed, st.payload_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 80])
+    args = parser.parse_args()
+
+    st = StreamlitStub()
+    visualization.st = st
+    limits = (lod.MAX_BARS, lod.SCATTER_MAX_POINTS)
+
+    print(f"{'escala':>8} {'entidades':>10} {'gráfica':>26} {'motor':>11} {'modo':>9} "
+          f"{'tiempo (ms)':>12} {'KiB':>9}")
+    for scale in args.scales:
+        cube = PopulationCube.from_frame(interpolate_years(make_long_frame(scale)))
+        states = len(cube.axes[STATE])
+        if scale == args.scales[0]:
+            # Calentamiento: importaciones perezosas y primer dibujo de cada motor
+            for chart in CHARTS:
+                for backend in BACKENDS:
+                    render(st, cube, chart, backend)
+        for chart in CHARTS:
+            for backend in BACKENDS:
+                for mode in ('detalle', 'completo'):
+                    if mode == 'completo':
+                        lod.MAX_BARS = lod.SCATTER_MAX_POINTS = states + 1
+                    try:
+                        elapsed, payload = render(st, cube, chart, backend)
+                    finally:
+                        lod.MAX_BARS, lod.SCATTER_MAX_POINTS = limits
+                    print(f"{scale:>8} {states:>10,} {chart:>26} {backend:>11} {mode:>9} "
+                          f"{elapsed:12.1f} {payload / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Latencia de la primera interacción con y sin precálculo de agregaciones.
+
+Para cada escala mide cuánto tarda `Precomputer.start` en regresar, cuánto
+tarda el recorrido completo en segundo plano y el costo de las agregaciones
+de una vista filtrada por entidad (las que piden las gráficas) en frío y
+después del precálculo.
+
+Uso: python benchmarks/bench_precompute.py --scales 1 10 --views 20
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.cube import PopulationCube  # noqa: E402
+from utils.data_processing import interpolate_years  # noqa: E402
+from utils.precompute import Precomputer, aggregate_cache, _state_views  # noqa: E402
+from synthetic import make_long_frame  # noqa: E402
+
+
+def views_ms(cube, views):
+    """Promedio en ms de las agregaciones de cada vista (año, entidad)."""
+    start = time.perf_counter()
+    for year, state in views:
+        _state_views(cube.select(years=[year], states=[state]), year)
+    return (time.perf_counter() - start) / len(views) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--views", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'escala':>8} {'start (ms)':>11} {'recorrido (s)':>14} {'tareas':>8} "
+          f"{'MiB caché':>10} {'vista fría (ms)':>16} {'vista precalculada (ms)':>24}")
+    for scale in args.scales:
+        cube = PopulationCube.from_frame(interpolate_years(make_long_frame(scale)))
+        views = [(rng.choice(cube.years), rng.choice(list(cube.axes['Entidad federativa'])))
+                 for _ in range(args.views)]
+
+        aggregate_cache.clear()
+        cold = views_ms(cube, views)
+
+        aggregate_cache.clear()
+        precomputer = Precomputer()
+        start = time.perf_counter()
+        precomputer.start(cube)
+        started = time.perf_counter() - start
+        while precomputer.running:
+            time.sleep(0.01)
+        total = time.perf_counter() - start
+        warm = views_ms(cube, views)
+
+        print(f"{scale:>8} {started * 1000:11.2f} {total:14.2f} {precomputer.done:>8,} "
+              f"{aggregate_cache.size / 2**20:10.1f} {cold:16.2f} {warm:24.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Consulta por línea de comandos contra cargar el archivo completo como lo hace el dashboard.
+
+El archivo procesado se escribe por bloques (`ChunkWriter`, un row group por
+bloque de entidades) para que el predicado pueda saltar row groups. Para
+una consulta de una entidad y un año agregada por género y edad se compara
+`utils.query.aggregate` (filtros y proyección en la lectura) con
+`load_processed` + cubo + `select` + `rollup`. Cada modo se mide en un
+proceso nuevo: tiempo y RSS máxima.
+
+Uso: python benchmarks/bench_query.py --scales 1 10 50
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.cube import PopulationCube  # noqa: E402
+from utils.data_processing import interpolate_years  # noqa: E402
+from utils.query import aggregate  # noqa: E402
+from utils.schema import STATE, AGE, GENDER  # noqa: E402
+from utils.storage import ChunkWriter, load_processed  # noqa: E402
+from synthetic import make_long_frame  # noqa: E402
+
+BY = [GENDER, AGE]
+STATES_PER_ROW_GROUP = 8
+
+
+def peak_mib():
+    """RSS máxima del proceso (Linux). `ru_maxrss` no sirve aquí: se hereda del padre en `exec`."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def run_query(mode, path, state, year):
+    start = time.perf_counter()
+    if mode == 'consulta':
+        result = aggregate(path, BY, years=[year], states=[state])
+    else:
+        cube = PopulationCube.from_frame(load_processed(path))
+        result = cube.select(years=[year], states=[state]).rollup(BY)
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'peak_mib': peak_mib(), 'total': int(result['Cantidad'].sum())}
+
+
+def write_store(df, path):
+    states = df[STATE].unique()
+    with ChunkWriter(path) as writer:
+        for i in range(0, len(states), STATES_PER_ROW_GROUP):
+            writer.write(df[df[STATE].isin(states[i:i + STATES_PER_ROW_GROUP])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--worker", nargs=4, metavar=("MODO", "RUTA", "ENTIDAD", "AÑO"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, path, state, year = args.worker
+        print(json.dumps(run_query(mode, path, state, int(year))))
+        return
+
+    print(f"{'escala':>8} {'filas':>11} {'modo':>9} {'tiempo (ms)':>12} {'RSS máx (MiB)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            df = interpolate_years(make_long_frame(scale))
+            path = Path(tmp) / f"datos_{scale}.parquet"
+            write_store(df, path)
+            state, year = df[STATE].iloc[len(df) // 2], int(df['Año'].max())
+
+            totals = set()
+            for mode in ('completo', 'consulta'):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, str(path), state, str(year)],
+                    capture_output=True, text=True, check=True,
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                totals.add(result['total'])
+                print(f"{scale:>8} {len(df):>11,} {mode:>9} {result['seconds'] * 1000:12.1f} "
+                      f"{result['peak_mib']:14.1f}")
+            if len(totals) != 1:
+                print(f"  ✗ Los totales no coinciden: {sorted(totals)}")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
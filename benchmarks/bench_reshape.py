@@ -0,0 +1,78 @@
+"""Compara el remodelado melt+cumcount+merge original contra `reshape_long`.
+
+Recorre combinaciones de número de entidades y de censos (años).
+
+Uso: python benchmarks/bench_reshape.py --scales 1 10 100 --years 6 20 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.data_processing import clean_raw, reshape_long  # noqa: E402
+from synthetic import make_raw_frame  # noqa: E402
+
+
+def legacy_reshape(df):
+    """Implementación original con tres melts y dos merges (sólo para comparar)."""
+    fixed_columns = ['Entidad federativa', 'Grupo quinquenal de edad']
+
+    df_hombres = pd.melt(df, id_vars=fixed_columns, value_vars=[col for col in df.columns if col.startswith('Hombres')], var_name='Género', value_name='Cantidad')
+    df_hombres['Género'] = 'Hombres'
+
+    df_mujeres = pd.melt(df, id_vars=fixed_columns, value_vars=[col for col in df.columns if col.startswith('Mujeres')], var_name='Género', value_name='Cantidad')
+    df_mujeres['Género'] = 'Mujeres'
+
+    df_year = pd.melt(df, id_vars=fixed_columns, value_vars=[col for col in df.columns if col.startswith('Año')], var_name='Año', value_name='Año_valor')
+    df_year['Año_valor'] = df_year['Año_valor'].astype(str)
+    df_year['Año'] = df_year['Año_valor'].str.extract(r'(\d{4})').astype(int)
+    df_year.drop(columns=['Año_valor'], inplace=True)
+
+    df_hombres['temp_index'] = df_hombres.groupby(fixed_columns).cumcount()
+    df_mujeres['temp_index'] = df_mujeres.groupby(fixed_columns).cumcount()
+    df_year['temp_index'] = df_year.groupby(fixed_columns).cumcount()
+
+    df_hombres = pd.merge(df_hombres, df_year, on=fixed_columns + ['temp_index'], how='left')
+    df_mujeres = pd.merge(df_mujeres, df_year, on=fixed_columns + ['temp_index'], how='left')
+
+    df_hombres.drop(columns=['temp_index'], inplace=True)
+    df_mujeres.drop(columns=['temp_index'], inplace=True)
+
+    df_final = pd.concat([df_hombres, df_mujeres], ignore_index=True)
+    return df_final[['Entidad federativa', 'Grupo quinquenal de edad', 'Género', 'Año', 'Cantidad']]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--years", type=int, nargs="+", default=[6, 20, 50],
+                        help="Número de censos (bloques de columnas) por archivo")
+    args = parser.parse_args()
+
+    print(f"{'escala':>8} {'censos':>7} {'filas':>12} {'original (s)':>13} {'vectorizado (s)':>16} {'aceleración':>12}")
+    for scale in args.scales:
+        for n_years in args.years:
+            years = list(range(2020 - 5 * (n_years - 1), 2021, 5))
+            df = clean_raw(make_raw_frame(scale, years=years))
+
+            old, old_time = timed(legacy_reshape, df)
+            new, new_time = timed(reshape_long, df)
+            pd.testing.assert_frame_equal(old, new, check_dtype=False)
+
+            print(f"{scale:>8} {n_years:>7} {len(new):>12,} {old_time:13.3f} "
+                  f"{new_time:16.3f} {old_time / new_time:11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
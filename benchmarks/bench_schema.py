@@ -0,0 +1,53 @@
+"""Memoria y latencia de group-by: columnas object/int64 contra el esquema canónico.
+
+Uso: python benchmarks/bench_schema.py --scales 1 10 78
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.data_processing import interpolate_years  # noqa: E402
+from utils.schema import enforce_schema  # noqa: E402
+from synthetic import make_long_frame  # noqa: E402
+
+GROUPINGS = [
+    ['Género', 'Grupo quinquenal de edad'],
+    ['Año', 'Género'],
+    ['Entidad federativa'],
+    ['Entidad federativa', 'Género'],
+]
+
+
+def groupby_time(df, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for by in GROUPINGS:
+            df.groupby(by, observed=True)['Cantidad'].sum()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 78])
+    args = parser.parse_args()
+
+    print(f"{'escala':>8} {'filas':>12} {'MiB antes':>10} {'MiB después':>12} "
+          f"{'groupby antes (ms)':>19} {'groupby después (ms)':>21}")
+    for scale in args.scales:
+        raw = interpolate_years(make_long_frame(scale))
+        typed = enforce_schema(raw)
+
+        mem_raw = raw.memory_usage(deep=True).sum() / 2**20
+        mem_typed = typed.memory_usage(deep=True).sum() / 2**20
+        print(f"{scale:>8} {len(raw):>12,} {mem_raw:10.1f} {mem_typed:12.1f} "
+              f"{groupby_time(raw) * 1000:19.1f} {groupby_time(typed) * 1000:21.1f}")
+
+
+if __name__ == "__main__":
+    main()
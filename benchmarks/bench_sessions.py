@@ -0,0 +1,89 @@
+"""Memoria residente al crecer el número de sesiones: copias por sesión contra el servicio compartido.
+
+Cada punto se mide en un proceso nuevo. "copias" reproduce `st.cache_data`,
+que entrega a cada sesión su propia copia (deserializada) del marco;
+"compartido" reproduce `DataService`, donde todas las sesiones reciben el
+mismo `DataSnapshot` (un solo cubo construido desde la tabla Arrow).
+
+Uso: python benchmarks/bench_sessions.py --scale 10 --sessions 1 10 50
+"""
+import argparse
+import pickle
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.cube import PopulationCube  # noqa: E402
+from utils.data_processing import interpolate_years  # noqa: E402
+from utils.data_service import DataSnapshot  # noqa: E402
+from utils.storage import load_processed, load_table, save_processed  # noqa: E402
+from synthetic import make_long_frame  # noqa: E402
+
+
+def rss_mib():
+    """Memoria residente actual del proceso (Linux) o, si no, el pico."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def simulate(mode, path, sessions):
+    """Abre `sessions` sesiones que filtran un año; regresa la RSS resultante."""
+    held = []
+    if mode == 'copias':
+        cached = pickle.dumps(load_processed(path))
+        for _ in range(sessions):
+            df = pickle.loads(cached)
+            cube = PopulationCube.from_frame(df)
+            held.append((df, cube.select(years=[cube.years[-1]])))
+    else:
+        snapshot = DataSnapshot('bench', load_table(path))
+        for _ in range(sessions):
+            cube = snapshot.cube
+            held.append((snapshot, cube.select(years=[cube.years[-1]])))
+    return rss_mib()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--worker", nargs=3, metavar=("MODO", "RUTA", "SESIONES"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, path, sessions = args.worker
+        print(simulate(mode, path, int(sessions)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "datos.parquet"
+        df = interpolate_years(make_long_frame(args.scale))
+        save_processed(df, path)
+        print(f"Escala {args.scale}: {len(df):,} filas, {path.stat().st_size / 2**20:.1f} MiB en disco")
+
+        print(f"{'sesiones':>9} {'RSS copias (MiB)':>17} {'RSS compartido (MiB)':>21}")
+        for sessions in args.sessions:
+            rss = {}
+            for mode in ('copias', 'compartido'):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, str(path), str(sessions)],
+                    capture_output=True, text=True, check=True
+                )
+                rss[mode] = float(out.stdout.strip().splitlines()[-1])
+            print(f"{sessions:>9} {rss['copias']:17.1f} {rss['compartido']:21.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Tiempo de arranque de `app.py`: importaciones (python -X importtime) y módulos pesados cargados.
+
+Cada corrida es un proceso nuevo que sólo importa `app` (no ejecuta el
+script). Se reporta el mejor de `--runs` tiempos, el tiempo acumulado de
+importación de cada dependencia directa de `app` y qué bibliotecas pesadas
+quedaron cargadas sin haber dibujado nada.
+
+Uso: python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+HEAVY = ['matplotlib', 'seaborn', 'sklearn', 'altair', 'scipy', 'openpyxl']
+CODE = (
+    "import sys, json, app; "
+    f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+)
+
+
+def parse_importtime(stderr):
+    """Renglones de -X importtime como (profundidad, módulo, acumulado en µs)."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), int(cumulative)))
+    return entries
+
+
+def direct_imports(entries, module):
+    """Dependencias importadas directamente por `module`.
+
+    -X importtime imprime en post-orden: los hijos de un módulo aparecen
+    justo antes que él, con una profundidad mayor.
+    """
+    index = next(i for i, (_, name, _) in enumerate(entries) if name == module)
+    depth = entries[index][0]
+    children = []
+    for child_depth, name, cumulative in reversed(entries[:index]):
+        if child_depth <= depth:
+            break
+        if child_depth == depth + 1:
+            children.append((name, cumulative))
+    return children
+
+
+def run_once():
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", CODE], cwd=SRC,
+                         capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    return elapsed, parse_importtime(out.stderr), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    elapsed, entries, loaded = min(runs, key=lambda run: run[0])
+
+    direct = direct_imports(entries, 'app')
+    app_total = next(c for _, name, c in entries if name == 'app')
+    print(f"Proceso completo (mejor de {args.runs}): {elapsed * 1000:.0f} ms")
+    print(f"Importación de app: {app_total / 1000:.0f} ms")
+    print(f"\n{'dependencia directa':<32} {'acumulado (ms)':>15}")
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32} {cumulative / 1000:15.1f}")
+    print(f"\nBibliotecas pesadas cargadas al arrancar: {', '.join(loaded) or 'ninguna'}")
+
+
+if __name__ == "__main__":
+    main()
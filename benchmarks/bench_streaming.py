@@ -0,0 +1,65 @@
+"""Memoria máxima y tiempo de la ingesta completa contra la ingesta por bloques.
+
+También verifica que ambas rutas producen la misma tabla procesada.
+
+Uso: python benchmarks/bench_streaming.py --scales 1 10 --chunk-size 2000
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.data_processing import KEY_COLUMNS, transform_data  # noqa: E402
+from utils.storage import load_processed  # noqa: E402
+from synthetic import make_raw_frame  # noqa: E402
+
+
+def measure(func, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def normalized(path):
+    df = load_processed(path)
+    df[KEY_COLUMNS] = df[KEY_COLUMNS].astype(str)
+    return df.sort_values(KEY_COLUMNS + ['Año']).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'escala':>8} {'renglones':>10} {'completa (s)':>13} {'MiB':>8} {'bloques (s)':>12} {'MiB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for scale in args.scales:
+            raw_path = tmp / f"raw_{scale}.xlsx"
+            raw = make_raw_frame(scale)
+            raw.to_excel(raw_path, index=False)
+
+            eager_path, stream_path = tmp / "eager.parquet", tmp / "stream.parquet"
+            eager_time, eager_mem = measure(transform_data, raw_path, eager_path)
+            stream_time, stream_mem = measure(transform_data, raw_path, stream_path,
+                                              chunk_size=args.chunk_size)
+
+            pd.testing.assert_frame_equal(normalized(eager_path), normalized(stream_path))
+            print(f"{scale:>8} {len(raw):>10,} {eager_time:13.2f} {eager_mem:8.1f} "
+                  f"{stream_time:12.2f} {stream_mem:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
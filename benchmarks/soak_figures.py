@@ -0,0 +1,114 @@
+"""Prueba de resistencia de las gráficas: memoria y figuras abiertas tras miles de re-ejecuciones.
+
+Cada re-ejecución dibuja todas las gráficas de matplotlib con otro año,
+otras entidades y la escala logarítmica alternada, con las cachés de
+imágenes y agregaciones vacías para que siempre se dibuje. Cada
+`--every` re-ejecuciones se muestrea la RSS, las figuras registradas en
+pyplot y los contadores de `figure_pool`; al final se compara la RSS de la
+primera y la segunda mitad de la corrida. Cada re-ejecución tarda unos
+segundos (seis imágenes a 200 dpi).
+
+Uso: python benchmarks/soak_figures.py --reruns 2000 --every 200
+"""
+import argparse
+import gc
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use('Agg')
+
+from utils import visualization  # noqa: E402
+from utils.cube import PopulationCube  # noqa: E402
+from utils.data_processing import interpolate_years  # noqa: E402
+from utils.figure_pool import figure_pool  # noqa: E402
+from utils.precompute import aggregate_cache  # noqa: E402
+from utils.render_cache import render_cache  # noqa: E402
+from bench_sessions import rss_mib  # noqa: E402
+from st_stub import StreamlitStub  # noqa: E402
+from synthetic import make_long_frame  # noqa: E402
+
+PLOTS = [
+    'plot_population_by_gender_age',
+    'plot_population_trend',
+    'plot_population_by_state',
+    'plot_population_scatter',
+    'plot_population_pie',
+    'forecast_population_quinquenal',
+]
+
+
+class SoakStub(StreamlitStub):
+    """Stub cuyos selectores y casillas cambian en cada re-ejecución."""
+
+    step = 0
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        self.calls['selectbox'] += 1
+        options = list(options)
+        return options[self.step % len(options)] if options else None
+
+    def checkbox(self, label, value=False, **kwargs):
+        self.calls['checkbox'] += 1
+        return self.step % 2 == 1
+
+
+def views(cube, rng):
+    """Cubos que recorre la prueba: completo, por año y por año y entidades."""
+    states = list(cube.axes['Entidad federativa'])
+    while True:
+        yield cube
+        year = rng.choice(cube.years)
+        yield cube.select(years=[year])
+        yield cube.select(years=[year], states=rng.sample(states, rng.randint(2, 5)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=2000)
+    parser.add_argument("--every", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    plt = visualization._pyplot()[0]
+    stub = SoakStub()
+    visualization.st = stub
+    cube = PopulationCube.from_frame(interpolate_years(make_long_frame(args.scale)))
+    source = views(cube, random.Random(0))
+
+    print(f"{'re-ejecución':>12} {'RSS (MiB)':>10} {'fig. pyplot':>12} {'creadas':>8} "
+          f"{'reusadas':>9} {'libres':>7}")
+    samples = []
+    for rerun in range(1, args.reruns + 1):
+        stub.step = rerun
+        view = next(source)
+        for name in PLOTS:
+            render_cache.clear()
+            aggregate_cache.clear()
+            getattr(visualization, name)(view, key_suffix="soak")
+        stub.reset()
+        if rerun % args.every == 0 or rerun == args.reruns:
+            gc.collect()
+            samples.append(rss_mib())
+            print(f"{rerun:>12,} {samples[-1]:10.1f} {len(plt.get_fignums()):>12} "
+                  f"{figure_pool.created:>8,} {figure_pool.reused:>9,} {figure_pool.idle:>7}",
+                  flush=True)
+
+    half = len(samples) // 2
+    if half:
+        first = max(samples[:half])
+        second = max(samples[half:])
+        print(f"\nRSS máxima primera mitad: {first:.1f} MiB, segunda mitad: {second:.1f} MiB "
+              f"({second - first:+.1f} MiB)")
+    if plt.get_fignums():
+        print(f"Quedaron {len(plt.get_fignums())} figuras abiertas en pyplot")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Sustituto de `streamlit` para ejecutar las gráficas sin servidor."""
+from collections import Counter
+
+
+class _Block:
+    """Contenedor vacío (columnas, pestañas, expansores)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class StreamlitStub:
+    """Imita la API de Streamlit que usan las gráficas.
+
+    Los widgets regresan su valor por omisión (lo que vería una sesión nueva),
+    las llamadas se cuentan en `calls`, los bytes enviados al navegador en
+    `payload_bytes` y los mensajes de `st.error`/`st.warning` en `messages`.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.payload_bytes = 0
+        self.messages = []
+
+    def reset(self):
+        self.calls.clear()
+        self.payload_bytes = 0
+        self.messages.clear()
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        self.calls['selectbox'] += 1
+        options = list(options)
+        return options[index] if options else None
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        self.calls['multiselect'] += 1
+        return list(default or [])
+
+    def radio(self, label, options, index=0, **kwargs):
+        self.calls['radio'] += 1
+        return list(options)[index]
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        self.calls['slider'] += 1
+        return min_value if value is None else value
+
+    def checkbox(self, label, value=False, **kwargs):
+        self.calls['checkbox'] += 1
+        return value
+
+    def columns(self, spec, **kwargs):
+        self.calls['columns'] += 1
+        return [_Block() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def tabs(self, labels):
+        self.calls['tabs'] += 1
+        return [_Block() for _ in labels]
+
+    def expander(self, *args, **kwargs):
+        self.calls['expander'] += 1
+        return _Block()
+
+    def image(self, image, **kwargs):
+        self.calls['image'] += 1
+        if isinstance(image, (bytes, bytearray)):
+            self.payload_bytes += len(image)
+
+    def altair_chart(self, chart, **kwargs):
+        self.calls['altair_chart'] += 1
+        self.payload_bytes += len(chart.to_json())
+
+    def error(self, message, *args, **kwargs):
+        self.calls['error'] += 1
+        self.messages.append(('error', str(message)))
+
+    def warning(self, message, *args, **kwargs):
+        self.calls['warning'] += 1
+        self.messages.append(('warning', str(message)))
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls[name] += 1
+        return call
@@ -0,0 +1,70 @@
+"""Generadores de datos sintéticos con la forma de Poblacion_02.xlsx."""
+import numpy as np
+import pandas as pd
+
+BASE_STATES = 32
+AGE_GROUPS = [
+    '0 a 4 años', '5 a 9 años', '10 a 14 años', '15 a 19 años',
+    '20 a 24 años', '25 a 29 años', '30 a 34 años', '35 a 39 años',
+    '40 a 44 años', '45 a 49 años', '50 a 54 años', '55 a 59 años',
+    '60 a 64 años', '65 a 69 años', '70 a 74 años', '75 a 79 años',
+    '80 a 84 años', '85 a 89 años', '90 a 94 años', '95 a 99 años',
+    '100 años y más', 'No especificado'
+]
+CENSUS_YEARS = [1990, 1995, 2000, 2005, 2010, 2020]
+
+
+def state_names(scale):
+    """Nombres de entidades para `scale` veces el número de estados."""
+    return [f"ENTIDAD {i:05d}" for i in range(BASE_STATES * scale)]
+
+
+def make_long_frame(scale=1, years=CENSUS_YEARS, seed=0):
+    """Marco largo (antes de interpolar) con `scale` veces los estados."""
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product(
+        [state_names(scale), AGE_GROUPS, ['Hombres', 'Mujeres'], years],
+        names=['Entidad federativa', 'Grupo quinquenal de edad', 'Género', 'Año']
+    )
+    df = index.to_frame(index=False)
+    df['Cantidad'] = rng.integers(1_000, 500_000, len(df), dtype=np.int64)
+    return df
+
+
+def _with_totals(values):
+    """Agrega los renglones 'Total' y nacionales a una matriz (entidad, grupo de edad).
+
+    Regresa los valores en el orden del libro: el bloque nacional primero y,
+    en cada entidad, el renglón 'Total' antes de los grupos de edad.
+    """
+    values = np.concatenate([values.sum(axis=0, keepdims=True), values])
+    values = np.concatenate([values.sum(axis=1, keepdims=True), values], axis=1)
+    return values.ravel()
+
+
+def make_raw_frame(scale=1, years=CENSUS_YEARS, seed=0):
+    """Marco ancho con las columnas del libro crudo de INEGI.
+
+    Como en el libro real, los renglones 'Total' y los nacionales son la suma
+    de los grupos de edad y de las entidades.
+    """
+    rng = np.random.default_rng(seed)
+    states = ['Estados Unidos Mexicanos'] + state_names(scale)
+    rows = pd.MultiIndex.from_product(
+        [states, ['Total'] + AGE_GROUPS],
+        names=['Entidad federativa', 'Grupo quinquenal de edad']
+    ).to_frame(index=False)
+
+    shape = (len(states) - 1, len(AGE_GROUPS))
+    blocks = [rows]
+    for i, year in enumerate(years):
+        suffix = f".{i}" if i else ""
+        hombres = _with_totals(rng.integers(1_000, 500_000, shape, dtype=np.int64))
+        mujeres = _with_totals(rng.integers(1_000, 500_000, shape, dtype=np.int64))
+        blocks.append(pd.DataFrame({
+            f"Total{suffix}": hombres + mujeres,
+            f"Hombres{suffix}": hombres,
+            f"Mujeres{suffix}": mujeres,
+            f"Año{suffix}": np.full(len(rows), year, dtype=np.int64),
+        }))
+    return pd.concat(blocks, axis=1)
@@ -1,44 +1,53 @@
-import pandas as pd
-import sys
 from pathlib import Path
-import os
 import pandas as pd
 import streamlit as st
-from utils.data_processing import transform_data
+from utils.data_service import DataService
+from utils.precompute import Precomputer
+from utils import instrumentation
+from utils.instrumentation import stage
 from utils.visualization import (
     plot_population_by_gender_age,
     plot_population_trend,
     plot_population_by_state,
     plot_population_scatter,
     plot_population_pie,
-    forecast_population_quinquenal
+    forecast_population_quinquenal,
+    available_backends
 )
 
-@st.cache_data
-def load_data(path):
-    """Carga los datos procesados con caché."""
-    return pd.read_excel(path)
+@st.cache_resource
+def get_data_service(input_path, output_path):
+    """Servicio de datos único por proceso, compartido por todas las sesiones.
 
-@st.cache_data
-def process_data(input_path, output_path):
-    """Ejecuta la transformación de datos con caché."""
-    if not os.path.exists(input_path):
-        st.error(f"Error: Archivo no encontrado en {input_path}")
-        st.stop()
-    
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    transform_data(input_path, output_path)
-    return load_data(output_path)
+    A diferencia de `st.cache_data`, que entrega una copia del DataFrame a
+    cada sesión, aquí todas usan el mismo cubo, construido una vez por
+    proceso desde la tabla Arrow. El servicio recarga la versión nueva cuando
+    se regeneran los datos procesados.
+    """
+    return DataService(input_path, output_path)
+
+@st.cache_resource
+def get_precomputer():
+    """Precálculo en segundo plano de las agregaciones, compartido por las sesiones."""
+    return Precomputer()
 
 if __name__ == '__main__':
     current_script = Path(__file__).resolve()
     project_root = current_script.parent.parent  
     
     input_path = project_root / "data" / "raw_data" / "Poblacion_02.xlsx"
-    output_path = project_root / "data" / "processed_data" / "archivo_transformado.xlsx"
+    output_path = project_root / "data" / "processed_data" / "archivo_transformado.parquet"
+
+    # Registro de etapas de esta ejecución sólo si el panel de depuración está activo
+    instrumentation.begin_run(st.session_state.get("debug_timings", False))
 
     try:
-        df = process_data(input_path, output_path)
+        with stage("app.load") as span:
+            snapshot = get_data_service(str(input_path), str(output_path)).snapshot()
+            span.count(snapshot.rows)
+        cube = snapshot.cube
+        # No bloquea: sólo programa el precálculo si es una versión nueva de los datos
+        get_precomputer().start(cube)
         st.success("Datos cargados exitosamente!")
     except Exception as e:
         st.error(f"Error crítico: {str(e)}")
@@ -47,48 +56,75 @@ if __name__ == '__main__':
     st.sidebar.header("Filtros Globales")
     selected_year = st.sidebar.selectbox(
         "Año",
-        sorted(df['Año'].unique()),
+        cube.years,
         key="global_year"
     )
     
     selected_states = st.sidebar.multiselect(
         "Estados",
-        options=df['Entidad federativa'].unique(),
+        options=list(cube.axes['Entidad federativa']),
         key="global_states"
     )
 
 
-    if not selected_states:  
-        df_filtered = df  
-    else:
-        df_filtered = df[
-            (df['Año'] == selected_year) &
-            (df['Entidad federativa'].isin(selected_states))
-        ]
+    with stage("app.filter"):
+        if not selected_states:  
+            cube_filtered = cube  
+        else:
+            cube_filtered = cube.select(years=[selected_year], states=selected_states)
+
 
+    backends = available_backends()
+    backend = st.sidebar.radio(
+        "Motor de gráficas",
+        backends,
+        index=backends.index('matplotlib'),
+        format_func={'matplotlib': "Matplotlib (servidor)", 'vega': "Vega-Lite (navegador)"}.get,
+        key="chart_backend"
+    )
 
     st.title(" Dashboard Demográfico")
     
 
     col1, col2 = st.columns([2, 1])
     with col1:
-        plot_population_by_gender_age(df_filtered, key_suffix="main")
+        plot_population_by_gender_age(cube_filtered, key_suffix="main", backend=backend)
     with col2:
-        plot_population_pie(df_filtered, key_suffix="main")
+        plot_population_pie(cube_filtered, key_suffix="main", backend=backend)
 
     with st.expander(" Análisis Detallado", expanded=True):
         tab1, tab2, tab3 = st.tabs(["Tendencia", "Estados", "Comparativa"])
         
         with tab1:
-            plot_population_trend(df, key_suffix="detail")
+            plot_population_trend(cube, key_suffix="detail", backend=backend)
         
         with tab2:
-            plot_population_by_state(df_filtered, key_suffix="detail")
+            plot_population_by_state(cube_filtered, key_suffix="detail", backend=backend)
         
         with tab3:
-            plot_population_scatter(df_filtered, key_suffix="detail")
+            plot_population_scatter(cube_filtered, key_suffix="detail", backend=backend)
 
 
     st.sidebar.header("Pronóstico")
     if st.sidebar.checkbox("Habilitar proyección", key="forecast_check"):
-        forecast_population_quinquenal(df, key_suffix="main")
\ No newline at end of file
+        forecast_population_quinquenal(cube, key_suffix="main", backend=backend)
+
+    st.sidebar.header("Depuración")
+    if st.sidebar.checkbox("Mostrar tiempos por etapa", key="debug_timings"):
+        records = instrumentation.end_run()
+        if records:
+            timings = pd.DataFrame(records)
+            timings["stage"] = ["· " * depth + name for depth, name in zip(timings["depth"], timings["stage"])]
+            timings[["seconds", "self_seconds"]] = (timings[["seconds", "self_seconds"]] * 1000).round(1)
+            st.sidebar.dataframe(
+                timings.drop(columns="depth").rename(columns={
+                    "stage": "Etapa", "seconds": "Total (ms)", "self_seconds": "Propio (ms)", "rows": "Renglones"
+                }),
+                hide_index=True
+            )
+            st.sidebar.download_button("Log de etapas (JSON)", instrumentation.to_json_lines(records),
+                                       file_name="etapas.jsonl", key="debug_json")
+            st.sidebar.download_button("Métricas (Prometheus)", instrumentation.to_prometheus(),
+                                       file_name="metrics.txt", key="debug_prometheus")
+        else:
+            st.sidebar.caption("Los tiempos aparecen a partir de la siguiente ejecución.")
@@ -0,0 +1,125 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from utils.data_processing import KEY_COLUMNS, prepare_raw, interpolate_years
+    from utils.storage import write_dataset
+except ImportError:  # Ejecución directa: python src/utils/batch_etl.py
+    from data_processing import KEY_COLUMNS, prepare_raw, interpolate_years
+    from storage import write_dataset
+
+
+def discover_raw_files(raw_dir, pattern='*.xlsx'):
+    """Libros crudos en `raw_dir`, ignorando temporales de Excel y archivos '._' de macOS."""
+    return sorted(
+        path for path in Path(raw_dir).glob(pattern)
+        if path.is_file() and not path.name.startswith(('._', '~$'))
+    )
+
+
+def quarantine_output(path, output_dir):
+    """Salida de referencia para la cuarentena de un libro del lote.
+
+    La cuarentena queda junto al dataset (no dentro, para no mezclarla con
+    las particiones) como '<libro>_cuarentena.csv'.
+    """
+    return Path(output_dir).parent / Path(path).name
+
+
+def extract_file(path, output_dir):
+    """Valida y remodela un libro crudo (se ejecuta en un proceso trabajador).
+
+    Usa `prepare_raw`, igual que `transform_data`: los renglones inválidos
+    se escriben en la cuarentena del libro (ver `quarantine_output`).
+    Regresa (ruta, marco largo, renglones en cuarentena, error). Los errores
+    se capturan para que un archivo dañado no detenga el lote.
+    """
+    try:
+        df = pd.read_excel(path)
+        long, quarantine = prepare_raw(df, quarantine_output(path, output_dir))
+        return str(path), long, len(quarantine), None
+    except Exception as e:
+        return str(path), None, 0, f"{type(e).__name__}: {e}"
+
+
+def run_batch(raw_dir, output_dir, workers=None, pattern='*.xlsx'):
+    """Transforma en paralelo todos los libros de `raw_dir`.
+
+    Cada libro se lee y remodela en un proceso aparte. Los resultados se
+    combinan (si dos archivos traen la misma fila gana el último en orden
+    alfabético), se interpolan juntos para que los años faltantes puedan
+    completarse con censos de archivos distintos y se escriben como un
+    dataset Parquet particionado por entidad en `output_dir`.
+    Regresa un diccionario con el reporte del lote, incluidos los renglones
+    en cuarentena de cada libro.
+    """
+    files = discover_raw_files(raw_dir, pattern)
+    start = time.perf_counter()
+    results, failures, quarantined = {}, {}, {}
+
+    if files:
+        # Las cuarentenas se escriben junto al dataset desde los trabajadores
+        Path(output_dir).parent.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(extract_file, path, output_dir): path for path in files}
+            for future in as_completed(futures):
+                try:
+                    path, long, bad_rows, error = future.result()
+                except Exception as e:  # p. ej. el proceso trabajador terminó abruptamente
+                    path, long, bad_rows, error = (str(futures[future]), None, 0,
+                                                   f"{type(e).__name__}: {e}")
+                if error:
+                    failures[path] = error
+                else:
+                    results[path] = long
+                    quarantined[path] = bad_rows
+
+    rows = 0
+    if results:
+        combined = pd.concat([results[path] for path in sorted(results)], ignore_index=True)
+        combined = combined.drop_duplicates(subset=KEY_COLUMNS + ['Año'], keep='last')
+        df_final = interpolate_years(combined)
+        write_dataset(df_final, output_dir, partition_cols=['Entidad federativa'])
+        rows = len(df_final)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'files': len(files),
+        'succeeded': sorted(results),
+        'failed': failures,
+        'quarantined': dict(sorted(quarantined.items())),
+        'rows': rows,
+        'seconds': elapsed,
+        'files_per_second': len(files) / elapsed if elapsed else 0.0,
+        'rows_per_second': rows / elapsed if elapsed else 0.0,
+    }
+
+
+def print_report(report):
+    print(f"Archivos procesados: {len(report['succeeded'])}/{report['files']}")
+    for path, error in report['failed'].items():
+        print(f"  ✗ {Path(path).name}: {error}")
+    for path, bad_rows in report['quarantined'].items():
+        if bad_rows:
+            print(f"  ⚠ {Path(path).name}: {bad_rows:,} renglones en cuarentena")
+    print(f"Renglones escritos: {report['rows']:,}")
+    print(f"Tiempo: {report['seconds']:.2f} s "
+          f"({report['files_per_second']:.2f} archivos/s, {report['rows_per_second']:,.0f} renglones/s)")
+
+
+if __name__ == '__main__':
+    project_root = Path(__file__).resolve().parent.parent.parent
+
+    parser = argparse.ArgumentParser(description="ETL en paralelo de todos los libros crudos.")
+    parser.add_argument('--raw-dir', default=project_root / "data" / "raw_data")
+    parser.add_argument('--output-dir', default=project_root / "data" / "processed_data" / "dataset")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--pattern', default='*.xlsx')
+    args = parser.parse_args()
+
+    print_report(run_batch(args.raw_dir, args.output_dir, args.workers, args.pattern))
@@ -0,0 +1,112 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+
+GENDER_COLORS = alt.Scale(domain=['Hombres', 'Mujeres'], range=['#66b3ff', '#ffcc99'])
+
+
+def gender_age_chart(grouped_df, order, title):
+    """Barras agrupadas por grupo de edad y género."""
+    return alt.Chart(grouped_df, title=title).mark_bar().encode(
+        x=alt.X('Grupo quinquenal de edad:N', sort=order, title="Grupo Quinquenal de Edad"),
+        xOffset='Género:N',
+        y=alt.Y('Cantidad:Q', title="Población Total"),
+        color=alt.Color('Género:N', scale=GENDER_COLORS),
+        tooltip=['Grupo quinquenal de edad', 'Género', alt.Tooltip('Cantidad:Q', format=',')],
+    ).interactive()
+
+
+def trend_chart(trend_df, title):
+    """Líneas de población por año y género."""
+    return alt.Chart(trend_df, title=title).mark_line(point=True, strokeWidth=2).encode(
+        x=alt.X('Año:O'),
+        y=alt.Y('Cantidad:Q', axis=alt.Axis(format=',')),
+        color=alt.Color('Género:N', scale=GENDER_COLORS),
+        tooltip=['Año', 'Género', alt.Tooltip('Cantidad:Q', format=',')],
+    ).interactive()
+
+
+def state_chart(state_data, use_log):
+    """Barras horizontales por entidad en el orden recibido (la barra 'Otras' al final).
+
+    La etiqueta de valor va en el tooltip.
+    """
+    scale = alt.Scale(type='log') if use_log else alt.Scale()
+    title = "Población (Escala Logarítmica)" if use_log else "Población Total"
+    order = [str(state) for state in state_data['Entidad federativa']]
+    return alt.Chart(state_data, title="Distribución por Estado").mark_bar().encode(
+        x=alt.X('Cantidad:Q', scale=scale, title=title, axis=alt.Axis(format=',')),
+        y=alt.Y('Entidad federativa:N', sort=order, title=""),
+        color=alt.Color('Cantidad:Q', scale=alt.Scale(scheme='viridis'), legend=None),
+        tooltip=['Entidad federativa', alt.Tooltip('Cantidad:Q', format=',')],
+    ).interactive()
+
+
+def scatter_chart(pivot_df, log_scale):
+    """Dispersión Hombres vs Mujeres con línea de referencia y = x."""
+    data = pivot_df.reset_index()
+    scale = alt.Scale(type='log') if log_scale else alt.Scale()
+    points = alt.Chart(data, title="Correlación por Género").mark_circle(
+        size=100, opacity=0.7, stroke='black'
+    ).encode(
+        x=alt.X('Hombres:Q', scale=scale, axis=alt.Axis(format=',')),
+        y=alt.Y('Mujeres:Q', scale=scale, axis=alt.Axis(format=',')),
+        tooltip=['Entidad federativa', alt.Tooltip('Hombres:Q', format=','),
+                 alt.Tooltip('Mujeres:Q', format=',')],
+    )
+    max_val = max(float(data[['Hombres', 'Mujeres']].max().max()), 1)
+    reference = alt.Chart(
+        alt.Data(values=[{'x': 1, 'y': 1}, {'x': max_val, 'y': max_val}])
+    ).mark_line(color='red', strokeDash=[4, 4], opacity=0.5).encode(x='x:Q', y='y:Q')
+    return (points + reference).interactive()
+
+
+def binned_scatter_chart(edges, counts, log_scale):
+    """Dispersión agrupada: un rectángulo por celda con entidades, coloreado por cuántas hay."""
+    men, women = np.nonzero(counts)
+    data = pd.DataFrame({
+        'Hombres': edges[men], 'Hombres hasta': edges[men + 1],
+        'Mujeres': edges[women], 'Mujeres hasta': edges[women + 1],
+        'Entidades': counts[men, women],
+    })
+    scale = alt.Scale(type='log') if log_scale else alt.Scale()
+    cells = alt.Chart(data, title="Correlación por Género").mark_rect().encode(
+        x=alt.X('Hombres:Q', scale=scale, axis=alt.Axis(format=',')),
+        x2='Hombres hasta:Q',
+        y=alt.Y('Mujeres:Q', scale=scale, axis=alt.Axis(format=',')),
+        y2='Mujeres hasta:Q',
+        color=alt.Color('Entidades:Q', scale=alt.Scale(scheme='viridis')),
+        tooltip=[alt.Tooltip('Hombres:Q', format=','), alt.Tooltip('Hombres hasta:Q', format=','),
+                 alt.Tooltip('Mujeres:Q', format=','), alt.Tooltip('Mujeres hasta:Q', format=','),
+                 'Entidades'],
+    )
+    low, high = float(edges[0]), float(edges[-1])
+    reference = alt.Chart(
+        alt.Data(values=[{'x': low, 'y': low}, {'x': high, 'y': high}])
+    ).mark_line(color='red', strokeDash=[4, 4], opacity=0.5).encode(x='x:Q', y='y:Q')
+    return (cells + reference).interactive()
+
+
+def pie_chart(gender_data, title):
+    """Dona de distribución por género."""
+    data = gender_data.rename('Cantidad').reset_index()
+    data['Porcentaje'] = data['Cantidad'] / data['Cantidad'].sum()
+    return alt.Chart(data, title=title).mark_arc(innerRadius=80).encode(
+        theta='Cantidad:Q',
+        color=alt.Color('Género:N', scale=GENDER_COLORS),
+        tooltip=['Género', alt.Tooltip('Cantidad:Q', format=','),
+                 alt.Tooltip('Porcentaje:Q', format='.1%')],
+    )
+
+
+def forecast_chart(historical, forecast):
+    """Serie histórica y puntos pronosticados."""
+    line = alt.Chart(historical, title="Proyección Quinquenal").mark_line(point=True).encode(
+        x=alt.X('Año:O'),
+        y=alt.Y('Cantidad:Q', title="Población Total", axis=alt.Axis(format='.3s')),
+        tooltip=['Año', alt.Tooltip('Cantidad:Q', format=',')],
+    )
+    points = alt.Chart(forecast).mark_point(color='red', size=100, filled=True).encode(
+        x='Año:O', y='Cantidad:Q', tooltip=['Año', alt.Tooltip('Cantidad:Q', format=',.0f')]
+    )
+    return line + points
@@ -0,0 +1,179 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+try:
+    from utils.schema import STATE, AGE, GENDER, YEAR, COUNT, ordered_labels
+except ImportError:  # Ejecución directa desde src/utils
+    from schema import STATE, AGE, GENDER, YEAR, COUNT, ordered_labels
+
+DIMENSIONS = (STATE, AGE, GENDER, YEAR)
+SELECTION_CACHE_SIZE = 64
+
+
+class PopulationCube:
+    """Cubo denso (entidad, grupo de edad, género, año) con la población.
+
+    Se construye una sola vez a partir del marco largo y responde las
+    agregaciones de las gráficas con sumas sobre ejes de NumPy en lugar de
+    `groupby` de pandas.
+    """
+
+    def __init__(self, values, axes, version=None):
+        self.values = values
+        self.axes = axes
+        # Identifica los datos (y filtros) del cubo; se usa en llaves de caché
+        self.version = version or _fingerprint(values, axes)
+        # Sub-cubos ya calculados: el cubo raíz es compartido entre recargas y
+        # sesiones, así que cada filtro se resuelve una sola vez
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, version=None):
+        """Construye el cubo a partir del marco largo procesado.
+
+        Acepta marcos con proyección de columnas: una dimensión ausente queda
+        con una sola etiqueta (`None`) que acumula todos los renglones.
+        """
+        codes, axes = [], {}
+        for dim in DIMENSIONS:
+            if dim in df.columns:
+                dim_codes, labels = pd.factorize(df[dim], sort=True)
+            else:
+                dim_codes, labels = np.zeros(len(df), dtype=np.intp), [None]
+            codes.append(dim_codes)
+            axes[dim] = np.asarray(labels)
+
+        shape = tuple(len(axes[dim]) for dim in DIMENSIONS)
+        flat = np.ravel_multi_index(codes, shape)
+        values = np.bincount(flat, weights=df['Cantidad'].to_numpy(dtype=float),
+                             minlength=int(np.prod(shape)))
+        return cls(np.rint(values).astype(np.int64).reshape(shape), axes, version)
+
+    @classmethod
+    def from_table(cls, table, version=None):
+        """Construye el cubo directamente de una tabla Arrow, sin pasar por pandas.
+
+        Sólo se convierten a NumPy los códigos de cada dimensión y las
+        cantidades, y se descartan al terminar. Los ejes quedan en el mismo
+        orden que con `from_frame(enforce_schema(table.to_pandas()))`.
+        """
+        codes, axes = [], {}
+        for dim in DIMENSIONS:
+            if dim in table.column_names:
+                dim_codes, labels = _encode(table.column(dim), dim)
+            else:
+                dim_codes, labels = np.zeros(table.num_rows, dtype=np.intp), np.asarray([None])
+            codes.append(dim_codes)
+            axes[dim] = labels
+
+        shape = tuple(len(axes[dim]) for dim in DIMENSIONS)
+        flat = np.ravel_multi_index(codes, shape)
+        weights = table.column(COUNT).to_numpy().astype(float)
+        values = np.bincount(flat, weights=weights, minlength=int(np.prod(shape)))
+        return cls(np.rint(values).astype(np.int64).reshape(shape), axes, version)
+
+    @property
+    def years(self):
+        return [int(y) for y in self.axes[YEAR]]
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    def select(self, years=None, states=None, ages=None, genders=None, memoize=True):
+        """Sub-cubo restringido a los años, entidades, edades y/o géneros indicados.
+
+        Los resultados se memorizan (LRU de `SELECTION_CACHE_SIZE` entradas);
+        con `memoize=False` se calcula sin tocar el LRU, p. ej. en recorridos
+        especulativos que no deben desplazar las selecciones de los usuarios.
+        """
+        if not memoize:
+            return self._select(years, states, ages, genders)
+        key = tuple(None if wanted is None else tuple(wanted)
+                    for wanted in (years, states, ages, genders))
+        with self._lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+
+        cube = self._select(years, states, ages, genders)
+        with self._lock:
+            self._selections[key] = cube
+            if len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return cube
+
+    def _select(self, years, states, ages, genders):
+        values, axes = self.values, dict(self.axes)
+        for dim, wanted in ((YEAR, years), (STATE, states), (AGE, ages), (GENDER, genders)):
+            if wanted is None:
+                continue
+            mask = np.isin(axes[dim], list(wanted))
+            values = values.compress(mask, axis=DIMENSIONS.index(dim))
+            axes[dim] = axes[dim][mask]
+        version = _fingerprint(self.version, [axes[dim] for dim in DIMENSIONS])
+        return PopulationCube(values, axes, version)
+
+    def year_range(self, start, end):
+        """Sub-cubo con los años dentro de [start, end]."""
+        years = self.axes[YEAR]
+        return self.select(years=years[(years >= start) & (years <= end)])
+
+    def total(self, by):
+        """Suma sobre los ejes que no están en `by`; regresa un arreglo."""
+        keep = [DIMENSIONS.index(dim) for dim in by]
+        drop = tuple(i for i in range(len(DIMENSIONS)) if i not in keep)
+        result = self.values.sum(axis=drop)
+        # Reordena los ejes restantes según el orden pedido en `by`
+        return result.transpose(np.argsort(np.argsort(keep)))
+
+    def rollup(self, by):
+        """Equivalente a `df.groupby(by)['Cantidad'].sum().reset_index()`."""
+        by = list(by)
+        index = pd.MultiIndex.from_product([self.axes[dim] for dim in by], names=by)
+        return pd.DataFrame({'Cantidad': self.total(by).ravel()}, index=index).reset_index()
+
+
+def _encode(column, dim):
+    """Códigos y etiquetas (sólo las presentes, en el orden canónico) de una columna Arrow."""
+    import pyarrow as pa
+
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    chunks = column.unify_dictionaries().chunks
+    if not chunks:
+        return np.zeros(0, dtype=np.intp), np.asarray([])
+    dictionary = chunks[0].dictionary.to_numpy(zero_copy_only=False)
+    indices = np.concatenate([chunk.indices.to_numpy() for chunk in chunks]).astype(np.intp)
+
+    # Reordena el diccionario (que sigue el orden de aparición) y quita las etiquetas sin renglones
+    present = np.bincount(indices, minlength=len(dictionary)) > 0
+    labels = ordered_labels(dim, dictionary[present].tolist())
+    position = {label: i for i, label in enumerate(labels)}
+    remap = np.array([position.get(label, -1) for label in dictionary.tolist()], dtype=np.intp)
+    return remap[indices], np.asarray(labels, dtype=dictionary.dtype)
+
+
+def _fingerprint(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, dict):
+            part = [part[dim] for dim in DIMENSIONS]
+        for item in (part if isinstance(part, list) else [part]):
+            if isinstance(item, np.ndarray) and item.dtype != object:
+                digest.update(item.tobytes())
+            else:
+                digest.update(repr(np.asarray(item).tolist()).encode())
+    return digest.hexdigest()[:16]
+
+
+def ensure_cube(data):
+    """Acepta un `PopulationCube` o un marco largo y regresa un cubo."""
+    if isinstance(data, PopulationCube):
+        return data
+    return PopulationCube.from_frame(data)
@@ -1,80 +1,250 @@
 import pandas as pd
+import numpy as np
 import os
 from pathlib import Path
 
+try:
+    from utils.storage import save_processed, ChunkWriter
+    from utils.schema import enforce_schema
+    from utils.instrumentation import stage, timed
+    from utils.validation import validate_raw, save_quarantine, quarantine_path
+except ImportError:  # Ejecución directa: python src/utils/data_processing.py
+    from storage import save_processed, ChunkWriter
+    from schema import enforce_schema
+    from instrumentation import stage, timed
+    from validation import validate_raw, save_quarantine, quarantine_path
+
+KEY_COLUMNS = ['Entidad federativa', 'Grupo quinquenal de edad', 'Género']
+TRANSFORM_VERSION = "5"  # Incrementar cuando cambie la lógica de transformación
+YEAR_STEP = 5  # Censos y conteos quinquenales; el pronóstico usa el mismo paso
+
+
+@timed('etl.transform_data', rows=True)
+def transform_data(input_path, output_path, chunk_size=None):
+    """Transforma los datos e interpola los años faltantes (p. ej. 2015).
+
+    Antes de remodelar se valida el libro (ver `prepare_raw`): un esquema
+    inválido lanza `ValueError` y los renglones inválidos se escriben en
+    '<salida>_cuarentena.csv' en lugar de detener el proceso.
+    Con `chunk_size` el libro se lee en modo streaming y la salida se escribe
+    por bloques (ver `transform_data_streaming`).
+    """
+    if chunk_size:
+        return transform_data_streaming(input_path, output_path, chunk_size)
 
-def transform_data(input_path, output_path):
-    """Transforma los datos y realiza la interpolación para el año 2015."""
     try:
-        df = pd.read_excel(input_path)
+        with stage('read_excel') as span:
+            df = pd.read_excel(input_path)
+            span.count(len(df))
     except FileNotFoundError:
         print(f"Error: Archivo no encontrado en {input_path}")
         return
 
-    # Limpieza y filtrado 
-    df = df[df['Grupo quinquenal de edad'] != 'Total']
-    df = df[df['Entidad federativa'] != 'Estados Unidos Mexicanos']
-    df.drop(columns=['Total.1', 'Total.2', 'Total.3', 'Total.4', 'Total.5', 'Total'], axis=1, errors='ignore', inplace=True)  
+    df_final, quarantine = prepare_raw(df, output_path)
+    report_quarantine(quarantine, output_path)
 
-    fixed_columns = ['Entidad federativa', 'Grupo quinquenal de edad']
+    # Interpolación lineal de los años faltantes (p. ej. 2015)
+    with stage('interpolate') as span:
+        df_final = enforce_schema(interpolate_years(df_final))
+        span.count(len(df_final))
 
-    df_hombres = pd.melt(df, id_vars=fixed_columns, value_vars=[col for col in df.columns if col.startswith('Hombres')], var_name='Género', value_name='Cantidad')
-    df_hombres['Género'] = 'Hombres'
+    try:
+        with stage('save'):
+            save_processed(df_final, output_path)
+        print(f"Datos transformados y guardados en {output_path}")
+    except Exception as e:
+        print(f"Error al guardar el archivo: {e}")
+    return df_final
 
-    df_mujeres = pd.melt(df, id_vars=fixed_columns, value_vars=[col for col in df.columns if col.startswith('Mujeres')], var_name='Género', value_name='Cantidad')
-    df_mujeres['Género'] = 'Mujeres'
 
-    df_year = pd.melt(df, id_vars=fixed_columns, value_vars=[col for col in df.columns if col.startswith('Año')], var_name='Año', value_name='Año_valor')
-    df_year['Año_valor'] = df_year['Año_valor'].astype(str)
-    df_year['Año'] = df_year['Año_valor'].str.extract('(\d{4})').astype(int)
-    df_year.drop(columns=['Año_valor'], inplace=True)  
+def transform_data_streaming(input_path, output_path, chunk_size=5000):
+    """Transforma el libro crudo por bloques de `chunk_size` renglones.
 
-   
-    df_hombres['temp_index'] = df_hombres.groupby(fixed_columns).cumcount()
-    df_mujeres['temp_index'] = df_mujeres.groupby(fixed_columns).cumcount()
-    df_year['temp_index'] = df_year.groupby(fixed_columns).cumcount()
+    Cada renglón crudo contiene todos los años de su (entidad, grupo de edad),
+    así que cada bloque se remodela e interpola de forma independiente y se
+    agrega al archivo Parquet. La memoria máxima depende del tamaño del
+    bloque y no del archivo. Cada bloque se valida por separado, sin la
+    comparación contra el total de cada entidad ni la búsqueda de duplicados
+    entre bloques (una entidad puede quedar repartida entre dos bloques).
+    Regresa el número de renglones escritos.
+    """
+    if not os.path.exists(input_path):
+        print(f"Error: Archivo no encontrado en {input_path}")
+        return
+
+    quarantined = []
+    with stage('etl.transform_streaming') as span, ChunkWriter(output_path) as writer:
+        for chunk in iter_raw_chunks(input_path, chunk_size):
+            long, quarantine = prepare_raw(chunk, check_totals=False)
+            quarantined.append(quarantine)
+            if long.empty:
+                continue
+            writer.write(interpolate_years(long))
+        span.count(writer.rows)
+
+    if quarantined:
+        quarantine = pd.concat(quarantined, ignore_index=True)
+        save_quarantine(quarantine, output_path)
+        report_quarantine(quarantine, output_path)
+
+    print(f"Datos transformados y guardados en {output_path}")
+    return writer.rows
 
-    df_hombres = pd.merge(df_hombres, df_year, on=fixed_columns + ['temp_index'], how='left')
-    df_mujeres = pd.merge(df_mujeres, df_year, on=fixed_columns + ['temp_index'], how='left')
 
-    df_hombres.drop(columns=['temp_index'], inplace=True)  
-    df_mujeres.drop(columns=['temp_index'], inplace=True)  
+def screen_raw(df, output_path=None, check_totals=True):
+    """Valida el libro crudo, separa los renglones inválidos y quita los totales.
 
-    df_final = pd.concat([df_hombres, df_mujeres], ignore_index=True)
-    df_final = df_final[['Entidad federativa', 'Grupo quinquenal de edad', 'Género', 'Año', 'Cantidad']]
+    Es el único camino de validación de todas las entradas del ETL (archivo
+    único, streaming, caché incremental y lote). Con `output_path` la
+    cuarentena se escribe junto a esa salida (ver `save_quarantine`).
+    Regresa (marco ancho limpio, cuarentena).
+    """
+    with stage('validate') as span:
+        df, quarantine = validate_raw(df, check_totals=check_totals)
+        span.count(len(quarantine))
+    if output_path is not None:
+        save_quarantine(quarantine, output_path)
+    return clean_raw(df), quarantine
 
-   
-    df_final = clean_text_columns(df_final)
 
-    # Interpolación lineal
-    df_final = df_final.set_index(['Entidad federativa', 'Grupo quinquenal de edad', 'Género'])
+def prepare_raw(df, output_path=None, check_totals=True):
+    """`screen_raw` seguido del remodelado al formato largo (sin interpolar).
 
-    def interpolar(grupo):
-        if 2015 not in grupo['Año'].values:
-            año_2010 = grupo[grupo['Año'] == 2010].iloc[0]
-            año_2020 = grupo[grupo['Año'] == 2020].iloc[0]
+    Regresa (marco largo, cuarentena).
+    """
+    df, quarantine = screen_raw(df, output_path, check_totals)
+    with stage('reshape') as span:
+        long = clean_text_columns(reshape_long(df))
+        span.count(len(long))
+    return long, quarantine
 
-            cantidad_2010 = año_2010['Cantidad']
-            cantidad_2020 = año_2020['Cantidad']
 
-            cantidad_2015 = cantidad_2010 + (cantidad_2020 - cantidad_2010) * (2015 - 2010) / (2020 - 2010)
+def report_quarantine(quarantine, output_path):
+    """Avisa cuántos renglones quedaron en cuarentena junto a la salida."""
+    if len(quarantine):
+        print(f"Renglones en cuarentena: {len(quarantine)} (ver {quarantine_path(output_path)})")
 
-            nueva_fila = año_2010.copy()
-            nueva_fila['Año'] = 2015
-            nueva_fila['Cantidad'] = int(round(cantidad_2015))
 
-            grupo = pd.concat([grupo, pd.DataFrame([nueva_fila])], ignore_index=True)
-            grupo = grupo.sort_values('Año')
-        return grupo
+def iter_raw_chunks(input_path, chunk_size):
+    """Lee la primera hoja del libro con openpyxl en modo `read_only`.
 
-    df_final = df_final.groupby(level=[0, 1, 2]).apply(interpolar).reset_index(level=[0, 1, 2])
-    df_final = df_final.reset_index(drop=True)
+    Produce DataFrames de hasta `chunk_size` renglones con los mismos nombres
+    de columna que asigna `pd.read_excel` ('Total', 'Total.1', ...).
+    """
+    from openpyxl import load_workbook
 
+    workbook = load_workbook(input_path, read_only=True, data_only=True)
     try:
-        df_final.to_excel(output_path, index=False)
-        print(f"Datos transformados y guardados en {output_path}")
-    except Exception as e:
-        print(f"Error al guardar el archivo: {e}")
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = dedupe_columns(next(rows, ()))
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def dedupe_columns(names):
+    """Renombra encabezados repetidos como lo hace pandas: X, X.1, X.2, ..."""
+    seen = {}
+    result = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        result.append(name if count == 0 else f"{name}.{count}")
+    return result
+
+
+def clean_raw(df):
+    """Elimina los renglones de totales y las columnas 'Total*' del libro crudo."""
+    df = df[df['Grupo quinquenal de edad'] != 'Total']
+    df = df[df['Entidad federativa'] != 'Estados Unidos Mexicanos']
+    return df.drop(columns=['Total.1', 'Total.2', 'Total.3', 'Total.4', 'Total.5', 'Total'], errors='ignore')
+
+
+def reshape_long(df):
+    """Convierte las columnas Hombres*/Mujeres*/Año* al formato largo.
+
+    Los bloques de columnas de cada censo están alineados por posición
+    (Hombres.i, Mujeres.i, Año.i), así que basta apilarlos con NumPy.
+    """
+    fixed_columns = ['Entidad federativa', 'Grupo quinquenal de edad']
+    hombres = [col for col in df.columns if col.startswith('Hombres')]
+    mujeres = [col for col in df.columns if col.startswith('Mujeres')]
+    year_columns = [col for col in df.columns if col.startswith('Año')]
+
+    if not len(hombres) == len(mujeres) == len(year_columns):
+        raise ValueError("Las columnas Hombres*, Mujeres* y Año* no están alineadas")
+
+    n_rows, n_blocks = len(df), len(year_columns)
+    years = parse_years(df[year_columns].to_numpy())
+
+    # Orden: género, bloque de censo, renglón (el mismo que producía pd.melt)
+    df_final = pd.DataFrame({
+        col: np.tile(df[col].to_numpy(), 2 * n_blocks) for col in fixed_columns
+    })
+    df_final['Género'] = np.repeat(['Hombres', 'Mujeres'], n_rows * n_blocks)
+    df_final['Año'] = np.tile(years.T.ravel(), 2)
+    df_final['Cantidad'] = np.concatenate([
+        df[hombres].to_numpy().T.ravel(),
+        df[mujeres].to_numpy().T.ravel(),
+    ])
+    return df_final
+
+
+def parse_years(values):
+    """Extrae el año (4 dígitos) de cada celda analizando sólo los valores únicos."""
+    codes, uniques = pd.factorize(values.ravel())
+    parsed = pd.Series(uniques).astype(str).str.extract(r'(\d{4})', expand=False).astype(int)
+    return parsed.to_numpy()[codes].reshape(values.shape)
+
+
+def interpolate_years(df, step=YEAR_STEP):
+    """Completa por interpolación lineal los años intermedios faltantes.
+
+    Pivotea los años a columnas, interpola todas las series en una sola
+    pasada de NumPy y regresa al formato largo ordenado por llave y año.
+    `step` es la separación entre años (quinquenal por omisión, así 2015 se
+    completa aunque sólo haya 2010 y 2020); los años de los datos fuera de
+    esa malla se conservan.
+    """
+    wide = df.set_index(KEY_COLUMNS + ['Año'])['Cantidad'].unstack('Año')
+    years = wide.columns.to_numpy(dtype=np.int64)
+
+    target_years = np.union1d(np.arange(years.min(), years.max() + 1, step), years)
+    wide = wide.reindex(columns=target_years)
+
+    values = wide.to_numpy(dtype=float)
+    known = ~np.isnan(values)
+    cols = np.arange(values.shape[1])
+
+    # Índice de la columna conocida anterior y siguiente para cada celda
+    prev_idx = np.maximum.accumulate(np.where(known, cols, -1), axis=1)
+    next_idx = np.minimum.accumulate(
+        np.where(known, cols, values.shape[1])[:, ::-1], axis=1
+    )[:, ::-1]
+
+    missing = ~known & (prev_idx >= 0) & (next_idx < values.shape[1])
+    rows, cells = np.nonzero(missing)
+    left, right = prev_idx[rows, cells], next_idx[rows, cells]
+    x0, x1 = target_years[left], target_years[right]
+    y0, y1 = values[rows, left], values[rows, right]
+    values[rows, cells] = np.round(
+        y0 + (y1 - y0) * (target_years[cells] - x0) / (x1 - x0)
+    )
+
+    wide = pd.DataFrame(values, index=wide.index, columns=pd.Index(target_years, name='Año'))
+    result = wide.stack().rename('Cantidad').reset_index()
+    result['Año'] = result['Año'].astype(int)
+    result['Cantidad'] = result['Cantidad'].astype('int64')
+    return result
 
 
 def clean_text_columns(df):
@@ -89,7 +259,7 @@ if __name__ == '__main__':
     project_root = current_script.parent.parent.parent
     
     input_path = project_root / "data" / "raw_data" / "Poblacion_02.xlsx"
-    output_path = project_root / "data" / "processed_data" / "archivo_transformado.xlsx"
+    output_path = project_root / "data" / "processed_data" / "archivo_transformado.parquet"
 
     print(f"📍 Ruta del script: {current_script}")
     print(f"📂 Directorio raíz: {project_root}")
@@ -0,0 +1,84 @@
+import threading
+import time
+from pathlib import Path
+
+try:
+    from utils.cube import PopulationCube, _fingerprint
+    from utils.etl_cache import cached_transform, file_signature
+    from utils.instrumentation import stage
+    from utils.storage import load_table
+except ImportError:  # Ejecución directa desde src/utils
+    from cube import PopulationCube, _fingerprint
+    from etl_cache import cached_transform, file_signature
+    from instrumentation import stage
+    from storage import load_table
+
+
+class DataSnapshot:
+    """Versión inmutable de los datos procesados, compartida entre sesiones.
+
+    Sólo conserva el cubo, construido una vez por versión directamente de la
+    tabla Arrow (sin marco de pandas); la tabla se libera al terminar, así
+    que el proceso tiene una sola copia de los datos para todas las
+    sesiones. Ninguna sesión debe modificar el cubo. Los filtros de la barra
+    lateral y de las gráficas pasan todos por `PopulationCube.select`, que
+    memoriza sus sub-cubos.
+    """
+
+    def __init__(self, version, table):
+        self.version = version
+        self.rows = table.num_rows
+        with stage('data.cube') as span:
+            self.cube = PopulationCube.from_table(table, version=version)
+            span.count(self.rows)
+        self.loaded_at = time.time()
+
+
+class DataService:
+    """Capa de datos de sólo lectura para todas las sesiones del proceso.
+
+    `snapshot()` regresa siempre el mismo `DataSnapshot` mientras no cambien
+    el archivo crudo ni el procesado; si cambian (p. ej. se regeneró el
+    archivo procesado con el ETL), carga la nueva versión y la publica sin
+    afectar a las sesiones que aún usan la anterior. La revisión de cambios
+    es un `stat` y se hace como máximo una vez cada `check_interval` segundos.
+    """
+
+    def __init__(self, input_path, output_path, check_interval=2.0):
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._raw_signature = None
+        self._checked_at = 0.0
+
+    def snapshot(self):
+        """Versión vigente de los datos, recargándola si los archivos cambiaron."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            version = self._current_version()
+            if self._snapshot is None or self._snapshot.version != version:
+                with stage('data.load_table') as span:
+                    table = load_table(self.output_path)
+                    span.count(table.num_rows)
+                self._snapshot = DataSnapshot(version, table)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _current_version(self):
+        if not self.input_path.exists():
+            raise FileNotFoundError(f"Archivo no encontrado en {self.input_path}")
+
+        raw_signature = file_signature(self.input_path)
+        if raw_signature != self._raw_signature or not self.output_path.exists():
+            # La caché en disco evita repetir la transformación si el contenido no cambió;
+            # la salida se lee después con `load_table`, así que aquí no se decodifica
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            cached_transform(self.input_path, self.output_path, load=False)
+            self._raw_signature = raw_signature
+
+        return _fingerprint(raw_signature, file_signature(self.output_path))
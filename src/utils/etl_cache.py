@@ -0,0 +1,145 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from utils.data_processing import (
+        TRANSFORM_VERSION, screen_raw, report_quarantine, reshape_long, clean_text_columns,
+        interpolate_years
+    )
+    from utils.storage import save_processed, load_processed
+    from utils.instrumentation import timed
+except ImportError:  # Ejecución directa desde src/utils
+    from data_processing import (
+        TRANSFORM_VERSION, screen_raw, report_quarantine, reshape_long, clean_text_columns,
+        interpolate_years
+    )
+    from storage import save_processed, load_processed
+    from instrumentation import timed
+
+STATE_COLUMN = 'Entidad federativa'
+BLOCK_PREFIXES = ('Hombres', 'Mujeres', 'Año')
+MANIFEST_NAME = 'manifest.json'
+PARTITIONS_NAME = 'partitions.parquet'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 del contenido del archivo, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_signature(path):
+    """Firma barata (tamaño, mtime) para invalidar cachés en memoria."""
+    stat = Path(path).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def default_cache_dir(output_path):
+    output_path = Path(output_path)
+    return output_path.parent / '.etl_cache' / output_path.stem
+
+
+def year_blocks(columns):
+    """Agrupa las columnas crudas por censo: {'': [...], '.1': [...], ...}."""
+    blocks = {}
+    for col in columns:
+        for prefix in BLOCK_PREFIXES:
+            if col.startswith(prefix):
+                blocks.setdefault(col[len(prefix):], []).append(col)
+    return {suffix: cols for suffix, cols in blocks.items() if len(cols) == len(BLOCK_PREFIXES)}
+
+
+def _unsuffixed(df, suffix):
+    """Quita el sufijo de censo ('.1', '.2', ...) a las columnas del bloque."""
+    if not suffix:
+        return df
+    return df.rename(columns=lambda c: c[:-len(suffix)] if c.endswith(suffix) else c)
+
+
+def partition_ids(block):
+    """Huella por entidad de un bloque de censo sin sufijos.
+
+    Suma el hash de cada renglón (entidad, grupo de edad y valores del
+    bloque) por entidad: reordenar renglones no cambia la huella, pero
+    cualquier cambio en los valores sí.
+    """
+    row_hash = pd.util.hash_pandas_object(block, index=False)
+    state_hash = row_hash.groupby(block[STATE_COLUMN].to_numpy()).sum()
+    return state_hash.map(lambda h: f"{TRANSFORM_VERSION}-{h:016x}")
+
+
+def _read_manifest(cache_dir):
+    path = cache_dir / MANIFEST_NAME
+    if path.exists():
+        return json.loads(path.read_text())
+    return {}
+
+
+@timed('etl.cached_transform', rows=True)
+def cached_transform(input_path, output_path, cache_dir=None, load=True):
+    """Versión con caché en disco de `transform_data`.
+
+    Si el hash del archivo crudo y la versión de la transformación coinciden
+    con la última ejecución, se reutiliza la salida sin transformar nada. Si
+    no, sólo se remodelan las particiones (entidad, censo) nuevas o
+    modificadas; las demás se toman del almacén de particiones. El libro se
+    valida con `screen_raw`, igual que en `transform_data` (renglones
+    inválidos a cuarentena).
+    Regresa la tabla procesada o, con `load=False`, sólo la ruta de la salida
+    (para quien la lee por su cuenta, p. ej. como tabla Arrow).
+    """
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(output_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    output_path = Path(output_path)
+
+    raw_hash = file_hash(input_path)
+    manifest = _read_manifest(cache_dir)
+    if (output_path.exists()
+            and manifest.get('raw_hash') == raw_hash
+            and manifest.get('version') == TRANSFORM_VERSION
+            and manifest.get('output') == str(output_path)):
+        return load_processed(output_path) if load else output_path
+
+    # Se valida con `screen_raw` y se remodela por partición (sólo las nuevas o modificadas)
+    df, quarantine = screen_raw(pd.read_excel(input_path), output_path)
+    report_quarantine(quarantine, output_path)
+
+    partitions_path = cache_dir / PARTITIONS_NAME
+    if partitions_path.exists():
+        store = pd.read_parquet(partitions_path)
+    else:
+        store = pd.DataFrame(columns=['_partition'])
+    cached = set(store['_partition'])
+
+    fixed_columns = [STATE_COLUMN, 'Grupo quinquenal de edad']
+    current, parts = set(), []
+    for suffix, block_columns in year_blocks(df.columns).items():
+        block = _unsuffixed(df[fixed_columns + block_columns], suffix)
+        ids = partition_ids(block)
+        current.update(ids)
+
+        missing = ids[~ids.isin(cached)]
+        if missing.empty:
+            continue
+        long = reshape_long(block[block[STATE_COLUMN].isin(missing.index)])
+        long['_partition'] = long[STATE_COLUMN].map(missing)
+        parts.append(long)
+
+    store = pd.concat([store[store['_partition'].isin(current)]] + parts, ignore_index=True)
+    store.to_parquet(partitions_path, index=False)
+
+    df_final = store.drop(columns='_partition')
+    df_final['Año'] = df_final['Año'].astype(int)
+    df_final['Cantidad'] = df_final['Cantidad'].astype('int64')
+    df_final = interpolate_years(clean_text_columns(df_final))
+    save_processed(df_final, output_path)
+
+    manifest = {'raw_hash': raw_hash, 'version': TRANSFORM_VERSION, 'output': str(output_path)}
+    (cache_dir / MANIFEST_NAME).write_text(json.dumps(manifest))
+    return load_processed(output_path) if load else output_path
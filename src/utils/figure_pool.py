@@ -0,0 +1,109 @@
+import threading
+from contextlib import contextmanager
+
+POOL_SIZE = 2  # Figuras libres que se conservan por tipo de gráfica
+
+
+class PooledFigure:
+    """Figura reutilizable creada con la API orientada a objetos de matplotlib.
+
+    No se registra en el gestor global de pyplot, así que no se acumula en
+    `plt.get_fignums()` ni depende de `plt.close`. `signature` y `artists`
+    permiten a cada gráfica actualizar sus artistas (alturas de barras, datos
+    de líneas) en lugar de redibujar cuando la estructura no cambió.
+    """
+
+    def __init__(self, figsize):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self._canvas_class = FigureCanvasAgg
+        self.fig = Figure(figsize=figsize)
+        self._canvas_class(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.signature = None
+        self.artists = {}
+
+    def reset(self):
+        """Borra la figura y deja un eje vacío para dibujar desde cero."""
+        self.fig.clear()
+        self.ax = self.fig.add_subplot()
+        self.signature = None
+        self.artists = {}
+
+    def recycle(self):
+        """Deja la figura lista para el siguiente préstamo conservando sus artistas."""
+        import matplotlib
+
+        # El lienzo Agg conserva el búfer del último renderizado (varios MB a
+        # 200 dpi); un lienzo nuevo lo libera
+        self._canvas_class(self.fig)
+        # Diseño por omisión, para que un `tight_layout` posterior parta del
+        # mismo estado que en una figura nueva y dé el mismo resultado
+        self.fig.set_layout_engine(None)
+        self.fig.subplots_adjust(**{
+            name: matplotlib.rcParams[f'figure.subplot.{name}']
+            for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+        })
+
+    def close(self):
+        self.fig.clear()
+        self.artists = {}
+        self.signature = None
+        self.recycle()
+
+
+class FigurePool:
+    """Reserva de figuras por tipo de gráfica, segura entre hilos.
+
+    `figure(chart, figsize)` presta una figura libre (o crea una) y la
+    devuelve al terminar; si la reserva ya está llena, o si el dibujo falló y
+    la figura quedó a medias, la figura se cierra en ese momento.
+    """
+
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self.created = 0
+        self.reused = 0
+        self._free = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self, chart, figsize):
+        with self._lock:
+            free = self._free.setdefault(chart, [])
+            pooled = free.pop() if free else None
+            if pooled is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        if pooled is None:
+            pooled = PooledFigure(figsize)
+
+        try:
+            yield pooled
+        except BaseException:
+            pooled.close()
+            raise
+
+        pooled.recycle()
+        with self._lock:
+            if len(free) < self.size:
+                free.append(pooled)
+                return
+        pooled.close()
+
+    @property
+    def idle(self):
+        with self._lock:
+            return sum(len(free) for free in self._free.values())
+
+    def clear(self):
+        with self._lock:
+            pooled = [figure for free in self._free.values() for figure in free]
+            self._free.clear()
+        for figure in pooled:
+            figure.close()
+
+
+figure_pool = FigurePool()
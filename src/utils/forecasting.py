@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from utils.cube import DIMENSIONS, YEAR
+except ImportError:  # Ejecución directa desde src/utils
+    from cube import DIMENSIONS, YEAR
+
+
+def future_years(years, horizons=1, step=5):
+    """Años a proyectar: `horizons` periodos de `step` años después del último."""
+    return int(max(years)) + step * np.arange(1, horizons + 1)
+
+
+def fit_trends(series, years, target_years):
+    """Ajusta una recta a cada renglón de `series` con un solo `lstsq`.
+
+    `series` tiene forma (n_series, n_años). Todas las series comparten la
+    misma matriz de diseño [1, año], así que se resuelven como un sistema con
+    múltiples lados derechos. Regresa (proyecciones, ajuste histórico, MAE).
+    """
+    series = np.atleast_2d(np.asarray(series, dtype=float))
+    origin = float(years[0])
+    x = np.asarray(years, dtype=float) - origin
+    design = np.column_stack([np.ones_like(x), x])
+    coef, *_ = np.linalg.lstsq(design, series.T, rcond=None)
+
+    fitted = (design @ coef).T
+    target = np.asarray(target_years, dtype=float) - origin
+    projected = (np.column_stack([np.ones_like(target), target]) @ coef).T
+    mae = np.abs(fitted - series).mean(axis=1)
+    return projected, fitted, mae
+
+
+def forecast_segments(cube, horizons=1, step=5):
+    """Proyecta cada (entidad, grupo de edad, género) del cubo.
+
+    Regresa un marco ordenado con una fila por segmento y año proyectado, con
+    las columnas de llave, 'Año', 'Proyección' y 'MAE' (error medio absoluto
+    del ajuste histórico del segmento).
+    """
+    years = np.asarray(cube.years)
+    keys = DIMENSIONS[:-1]
+    series = cube.values.reshape(-1, len(years))
+    targets = future_years(years, horizons, step)
+    projected, _, mae = fit_trends(series, years, targets)
+
+    index = pd.MultiIndex.from_product([cube.axes[dim] for dim in keys], names=list(keys))
+    result = pd.DataFrame(projected, index=index, columns=pd.Index(targets, name=YEAR))\
+               .stack()\
+               .rename('Proyección')\
+               .reset_index()
+    result['MAE'] = np.repeat(mae, len(targets))
+    return result
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Recolección global (métricas Prometheus y logs) activada por variable de entorno;
+# además cada ejecución del script puede activar su propio registro con `begin_run`.
+ENABLED = os.environ.get('DASHBOARD_METRICS', '') not in ('', '0')
+
+
+class _ThreadState(threading.local):
+    # Valores por omisión a nivel de clase: leerlos no lanza AttributeError,
+    # que es lo que hace caro un `getattr(..., None)` sobre `threading.local`
+    run = None
+    stack = ()
+
+
+_local = _ThreadState()
+_lock = threading.Lock()
+_totals = {}  # ruta de la etapa -> [llamadas, segundos, renglones]
+
+
+def enable(flag=True):
+    """Activa o desactiva la recolección global para todo el proceso."""
+    global ENABLED
+    ENABLED = flag
+
+
+def _collecting():
+    return ENABLED or _local.run is not None
+
+
+class Stage:
+    """Etapa medida; se usa como administrador de contexto (ver `stage`).
+
+    Las etapas se anidan por hilo: la ruta de una etapa incluye la de su
+    padre ('plot.trend/aggregate') y `self_seconds` descuenta el tiempo de
+    las etapas hijas.
+    """
+
+    __slots__ = ('name', 'path', 'depth', 'rows', 'seconds', 'child_seconds', '_start', '_parent')
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.seconds = None
+        self.child_seconds = 0.0
+
+    def count(self, rows):
+        """Registra el número de renglones procesados por la etapa."""
+        self.rows = int(rows)
+
+    @property
+    def self_seconds(self):
+        return None if self.seconds is None else self.seconds - self.child_seconds
+
+    def __enter__(self):
+        if not _local.stack:
+            _local.stack = []
+        stack = _local.stack
+        self._parent = stack[-1] if stack else None
+        self.path = f"{self._parent.path}/{self.name}" if self._parent else self.name
+        self.depth = len(stack)
+        stack.append(self)
+        if _local.run is not None:
+            _local.run.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._start
+        _local.stack.pop()
+        if self._parent is not None:
+            self._parent.child_seconds += self.seconds
+        _record(self)
+        return False
+
+    def as_dict(self):
+        return {
+            'stage': self.path,
+            'depth': self.depth,
+            'seconds': self.seconds,
+            'self_seconds': self.self_seconds,
+            'rows': self.rows,
+        }
+
+
+class _NullStage:
+    """Etapa vacía que se entrega cuando la instrumentación está desactivada."""
+
+    __slots__ = ()
+
+    def count(self, rows):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Administrador de contexto que mide una etapa.
+
+    Con la instrumentación desactivada regresa una etapa vacía compartida, así
+    que el costo es una consulta de atributo. Uso::
+
+        with stage('aggregate') as span:
+            df = ...
+            span.count(len(df))
+    """
+    if not _collecting():
+        return _NULL_STAGE
+    return Stage(name)
+
+
+def timed(name=None, rows=False):
+    """Decorador que mide cada llamada a la función como una etapa.
+
+    Con `rows=True` registra `len()` del resultado como renglones procesados.
+    """
+    def decorator(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _collecting():
+                return func(*args, **kwargs)
+            with Stage(label) as span:
+                result = func(*args, **kwargs)
+                if rows and hasattr(result, '__len__'):
+                    span.count(len(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def _record(span):
+    with _lock:
+        totals = _totals.setdefault(span.path, [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += span.seconds
+        totals[2] += span.rows or 0
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps(span.as_dict(), ensure_ascii=False))
+
+
+def begin_run(enabled=True):
+    """Inicia el registro de etapas de la ejecución actual del script (por hilo)."""
+    _local.run = [] if enabled else None
+    _local.stack = []
+
+
+def end_run():
+    """Termina el registro de la ejecución actual y regresa sus etapas en orden de inicio."""
+    run = _local.run or []
+    _local.run = None
+    return [span.as_dict() for span in run if span.seconds is not None]
+
+
+def to_json_lines(records):
+    """Etapas como log estructurado: un objeto JSON por línea."""
+    return "\n".join(json.dumps(record, ensure_ascii=False) for record in records)
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus():
+    """Totales acumulados del proceso en formato de texto de Prometheus."""
+    with _lock:
+        totals = sorted(_totals.items())
+    lines = [
+        "# HELP dashboard_stage_seconds Duración de las etapas del dashboard.",
+        "# TYPE dashboard_stage_seconds summary",
+    ]
+    for path, (calls, seconds, _) in totals:
+        lines.append(f'dashboard_stage_seconds_sum{{stage="{_label(path)}"}} {seconds:.6f}')
+        lines.append(f'dashboard_stage_seconds_count{{stage="{_label(path)}"}} {calls}')
+    lines += [
+        "# HELP dashboard_stage_rows_total Renglones procesados por etapa.",
+        "# TYPE dashboard_stage_rows_total counter",
+    ]
+    for path, (_, _, rows) in totals:
+        lines.append(f'dashboard_stage_rows_total{{stage="{_label(path)}"}} {rows}')
+    return "\n".join(lines) + "\n"
+
+
+def reset_totals():
+    with _lock:
+        _totals.clear()
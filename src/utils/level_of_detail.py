@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from utils.schema import STATE, COUNT
+except ImportError:  # Ejecución directa desde src/utils
+    from schema import STATE, COUNT
+
+# Con más entidades que estos límites las gráficas cambian de nivel de detalle:
+# barras de una ventana del ranking más 'Otras', y dispersión agrupada en celdas
+MAX_BARS = 40
+SCATTER_MAX_POINTS = 500
+SCATTER_BINS = 40
+OTHER_LABEL = 'Otras'
+
+
+def needs_top_n(count):
+    return count > MAX_BARS
+
+
+def needs_binning(count):
+    return count > SCATTER_MAX_POINTS
+
+
+def rank_windows(count, size=None):
+    """Ventanas (inicio, fin) del ranking de entidades que se pueden mostrar."""
+    size = size or MAX_BARS - 1
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def top_entities(state_data, start=0, size=None):
+    """Entidades de la ventana [start, start + size) del ranking y una barra 'Otras'.
+
+    `state_data` viene ordenado de mayor a menor (el rollup por entidad de
+    las gráficas). 'Otras (n)' suma las entidades fuera de la ventana y va al
+    final, así que la gráfica tiene a lo más `size + 1` barras sin importar
+    cuántas entidades haya.
+    """
+    size = size or MAX_BARS - 1
+    window = state_data.iloc[start:start + size]
+    rest = len(state_data) - len(window)
+    if not rest:
+        return window
+    other = pd.DataFrame({
+        STATE: [f"{OTHER_LABEL} ({rest:,})"],
+        COUNT: [state_data[COUNT].sum() - window[COUNT].sum()],
+    })
+    return pd.concat([window[[STATE, COUNT]].astype({STATE: object}), other], ignore_index=True)
+
+
+def bin_scatter(pivot_df, log_scale, bins=None):
+    """Histograma 2D de (Hombres, Mujeres) por entidad.
+
+    Ambos ejes usan los mismos bordes entre el mínimo y el máximo de los
+    datos (logarítmicos con `log_scale`) para que la línea y = x siga siendo
+    la referencia. Regresa (bordes, conteos), con conteos[i, j] = entidades
+    con Hombres en la celda i y Mujeres en la j.
+    """
+    bins = bins or SCATTER_BINS
+    x = pivot_df['Hombres'].to_numpy(dtype=float)
+    y = pivot_df['Mujeres'].to_numpy(dtype=float)
+    if log_scale:
+        keep = (x > 0) & (y > 0)
+        x, y = x[keep], y[keep]
+    low = min(x.min(), y.min()) if len(x) else 1.0
+    high = max(x.max(), y.max(), low * 1.01) if len(x) else 10.0
+    edges = np.geomspace(low, high, bins + 1) if log_scale else np.linspace(low, high, bins + 1)
+    counts, _, _ = np.histogram2d(x, y, bins=[edges, edges])
+    return edges, counts.astype(np.int64)
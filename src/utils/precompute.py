@@ -0,0 +1,198 @@
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    from utils.cube import STATE, AGE, GENDER, YEAR
+    from utils.forecasting import forecast_segments
+    from utils.instrumentation import stage
+except ImportError:  # Ejecución directa desde src/utils
+    from cube import STATE, AGE, GENDER, YEAR
+    from forecasting import forecast_segments
+    from instrumentation import stage
+
+logger = logging.getLogger(__name__)
+
+# Proporción de `max_bytes` a partir de la cual el precálculo se detiene, para
+# que las entradas especulativas no desplacen a las que piden los usuarios
+PRECOMPUTE_FILL_RATIO = 0.8
+DEFAULT_HORIZONS = (1,)
+
+
+class AggregateCache:
+    """Caché LRU de agregaciones (DataFrames pequeños) acotada en bytes.
+
+    La comparten todas las sesiones y el precálculo en segundo plano. Los
+    valores guardados no deben modificarse.
+    """
+
+    def __init__(self, max_bytes=32 * 2**20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        nbytes = int(value.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._items[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+aggregate_cache = AggregateCache(
+    max_bytes=int(os.environ.get('AGGREGATE_CACHE_MAX_MB', 32)) * 2**20,
+)
+
+
+def cached_rollup(cube, by):
+    """`cube.rollup(by)` consultando primero la caché compartida."""
+    key = ('rollup', cube.version, tuple(by))
+    result = aggregate_cache.get(key)
+    if result is None:
+        result = cube.rollup(by)
+        aggregate_cache.put(key, result)
+    return result
+
+
+def cached_forecast_segments(cube, horizons=1):
+    """`forecast_segments(cube, horizons)` consultando primero la caché compartida."""
+    key = ('forecast_segments', cube.version, horizons)
+    result = aggregate_cache.get(key)
+    if result is None:
+        result = forecast_segments(cube, horizons)
+        aggregate_cache.put(key, result)
+    return result
+
+
+def plan(cube, horizons=DEFAULT_HORIZONS):
+    """Agregaciones que piden las gráficas, en orden de prioridad.
+
+    Primero las vistas sin filtro de entidades (cada año, tendencia completa y
+    pronóstico), luego cada filtro de una sola entidad por año. Produce
+    funciones sin argumentos; son las mismas llamadas que hace
+    `utils.visualization`, así que las llaves coinciden.
+    """
+    years = cube.years
+    yield lambda: cached_rollup(cube, [STATE])
+    yield lambda: cached_rollup(cube, [STATE, GENDER])
+    yield lambda: cached_rollup(cube.year_range(min(years), max(years)), [YEAR, GENDER])
+    yield lambda: cached_rollup(cube.select(), [YEAR])
+    for horizon in horizons:
+        yield lambda horizon=horizon: cached_forecast_segments(cube, horizon)
+    for year in years:
+        yield lambda year=year: _year_views(cube.select(years=[year]))
+
+    for year in years:
+        for state in cube.axes[STATE]:
+            yield lambda year=year, state=state: _state_views(
+                cube.select(years=[year], states=[state], memoize=False), year
+            )
+
+
+def _year_views(cube_year):
+    cached_rollup(cube_year, [GENDER, AGE])
+    cached_rollup(cube_year, [GENDER])
+
+
+def _state_views(cube_state, year):
+    _year_views(cube_state.select(years=[year], memoize=False))
+    cached_rollup(cube_state, [STATE])
+    cached_rollup(cube_state, [STATE, GENDER])
+
+
+class Precomputer:
+    """Precálculo en segundo plano de las agregaciones de las gráficas.
+
+    `start(cube)` regresa de inmediato: los hilos trabajadores recorren
+    `plan(cube)` y guardan los resultados en `aggregate_cache`. Un cubo nuevo
+    (otra versión de datos) cancela el recorrido anterior; `cancel()` lo
+    detiene entre tareas. El recorrido también se detiene cuando la caché
+    llega a `PRECOMPUTE_FILL_RATIO` de su capacidad. Los hilos son daemon
+    para que el proceso termine (p. ej. con SIGTERM) sin esperar el recorrido.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.done = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._cancelled = threading.Event()
+        self._threads = []
+        atexit.register(self.cancel)
+
+    def start(self, cube, horizons=DEFAULT_HORIZONS):
+        """Programa el precálculo para `cube` si no se ha hecho para su versión."""
+        with self._lock:
+            if cube.version == self._version:
+                return
+            self._cancelled.set()
+            self._cancelled = cancelled = threading.Event()
+            self._version = cube.version
+            self.done = 0
+            tasks = plan(cube, horizons)
+            tasks_lock = threading.Lock()
+            self._threads = [
+                threading.Thread(target=self._work, args=(tasks, tasks_lock, cancelled),
+                                 name=f'precompute-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def cancel(self):
+        """Detiene el precálculo en curso después de la tarea actual."""
+        with self._lock:
+            self._cancelled.set()
+            self._version = None
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _work(self, tasks, tasks_lock, cancelled):
+        with stage('precompute') as span:
+            while not cancelled.is_set():
+                if aggregate_cache.size >= aggregate_cache.max_bytes * PRECOMPUTE_FILL_RATIO:
+                    break
+                with tasks_lock:
+                    task = next(tasks, None)
+                if task is None:
+                    break
+                try:
+                    task()
+                except Exception:  # Una tarea fallida no detiene el recorrido
+                    logger.exception("Error al precalcular una agregación")
+                with tasks_lock:
+                    self.done += 1
+            span.count(self.done)
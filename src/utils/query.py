@@ -0,0 +1,224 @@
+import argparse
+import sys
+import unicodedata
+from pathlib import Path
+
+try:
+    from utils.cube import PopulationCube
+    from utils.instrumentation import timed
+    from utils.schema import STATE, AGE, GENDER, YEAR, COUNT, COLUMNS, enforce_schema
+    from utils.storage import detect_format
+except ImportError:  # Ejecución directa: python src/utils/query.py
+    from cube import PopulationCube
+    from instrumentation import timed
+    from schema import STATE, AGE, GENDER, YEAR, COUNT, COLUMNS, enforce_schema
+    from storage import detect_format
+
+BATCH_SIZE = 64 * 1024
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# Nombres cortos de las dimensiones para la línea de comandos
+DIMENSION_NAMES = {
+    'entidad': STATE,
+    'estado': STATE,
+    'edad': AGE,
+    'genero': GENDER,
+    'año': YEAR,
+    'anio': YEAR,
+}
+# Columnas exportables con --columns: las dimensiones más la cantidad (no se agrega por ella)
+COLUMN_NAMES = {**DIMENSION_NAMES, 'cantidad': COUNT}
+
+
+def parse_columns(text, names=DIMENSION_NAMES):
+    """Convierte 'genero,edad' en columnas del almacén.
+
+    Acepta los nombres cortos de `names` o los nombres de columna, sin
+    distinguir mayúsculas ni acentos.
+    """
+    allowed = set(names.values())
+    columns = []
+    for name in filter(None, (part.strip() for part in text.split(','))):
+        key = _ascii(name).lower()
+        column = names.get(key) or names.get(name.lower())
+        if column is None:
+            column = next((col for col in COLUMNS
+                           if col in allowed and _ascii(col).lower() == key), None)
+        if column is None:
+            raise ValueError(f"Columna desconocida: {name!r} (opciones: {', '.join(names)})")
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def _ascii(text):
+    return unicodedata.normalize('NFKD', text).encode('ascii', errors='ignore').decode('utf-8')
+
+
+def normalize_states(states):
+    """Escribe las entidades como en el almacén (sin acentos y en mayúsculas)."""
+    return [_ascii(state).strip().upper() for state in states]
+
+
+def open_dataset(path):
+    """`pyarrow.dataset` sobre el archivo procesado o el dataset particionado."""
+    import pyarrow.dataset as ds
+
+    fmt = detect_format(path)
+    if fmt not in ('parquet', 'feather'):
+        raise ValueError(f"El formato {fmt} sólo está disponible para exportar")
+    partitioning = 'hive' if Path(path).is_dir() else None
+    return ds.dataset(path, format=fmt, partitioning=partitioning)
+
+
+def filter_expression(years=None, states=None, ages=None, genders=None):
+    """Predicado de Arrow equivalente a `PopulationCube.select`; `None` si no hay filtros."""
+    import pyarrow.dataset as ds
+
+    expression = None
+    for column, wanted in ((YEAR, years), (STATE, states), (AGE, ages), (GENDER, genders)):
+        if wanted is None:
+            continue
+        condition = ds.field(column).isin(list(wanted))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _row_groups(fragment, wanted):
+    """Row groups cuyas estadísticas (mín., máx.) pueden contener los valores pedidos."""
+    keep = []
+    for row_group in fragment.row_groups:
+        stats = row_group.statistics
+        if all(column not in stats
+               or any(stats[column]['min'] <= value <= stats[column]['max'] for value in values)
+               for column, values in wanted.items()):
+            keep.append(row_group.id)
+    return keep
+
+
+def prune(dataset, years=None, states=None, ages=None, genders=None):
+    """Dataset con sólo las particiones y row groups que pueden cumplir los filtros.
+
+    Arrow descarta por sí mismo las particiones, pero no usa las estadísticas
+    de los row groups con `isin` ni con columnas de diccionario (las del
+    almacén), así que los row groups se descartan aquí.
+    """
+    import pyarrow.dataset as ds
+
+    wanted = {column: values for column, values in
+              ((YEAR, years), (STATE, states), (AGE, ages), (GENDER, genders))
+              if values is not None}
+    if not wanted:
+        return dataset
+
+    fragments = []
+    for fragment in dataset.get_fragments(filter=filter_expression(years, states, ages, genders)):
+        if isinstance(fragment, ds.ParquetFileFragment):
+            row_groups = _row_groups(fragment, wanted)
+            if not row_groups:
+                continue
+            fragment = fragment.subset(row_group_ids=row_groups)
+        fragments.append(fragment)
+    return ds.FileSystemDataset(fragments, dataset.schema, dataset.format, dataset.filesystem)
+
+
+def scan(path, columns=None, years=None, states=None, ages=None, genders=None,
+         batch_size=BATCH_SIZE):
+    """Scanner de Arrow con los filtros y la proyección empujados a la lectura.
+
+    Sólo se leen las columnas de `columns` (los filtros pueden usar columnas
+    no proyectadas) de las particiones y row groups que pueden cumplir el
+    predicado (ver `prune`), así que no se carga el archivo completo.
+    """
+    if states is not None:
+        states = normalize_states(states)
+    dataset = prune(open_dataset(path), years, states, ages, genders)
+    return dataset.scanner(
+        columns=list(columns or COLUMNS),
+        filter=filter_expression(years, states, ages, genders),
+        batch_size=batch_size,
+    )
+
+
+@timed('query.aggregate', rows=True)
+def aggregate(path, by, years=None, states=None, ages=None, genders=None):
+    """Población sumada por las columnas `by` sobre los renglones filtrados.
+
+    Usa el mismo cubo y `rollup` que las gráficas, así que los totales
+    coinciden con los del dashboard. Regresa un DataFrame.
+    """
+    by = list(by)
+    table = scan(path, by + [COUNT], years, states, ages, genders).to_table()
+    frame = enforce_schema(table.to_pandas())
+    return PopulationCube.from_frame(frame).rollup(by)
+
+
+def write_batches(batches, schema, fmt, sink):
+    """Escribe lotes de Arrow en `sink` como CSV o Parquet, uno a la vez."""
+    if fmt == 'csv':
+        import pyarrow.csv as pcsv
+        writer = pcsv.CSVWriter(sink, schema)
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        raise ValueError(f"Formato de salida no soportado: {fmt}")
+
+    rows = 0
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def write_frame(df, fmt, sink):
+    """Escribe un DataFrame (p. ej. el resultado de `aggregate`) con `write_batches`."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return write_batches(table.to_batches(BATCH_SIZE), table.schema, fmt, sink)
+
+
+def main(argv=None):
+    project_root = Path(__file__).resolve().parent.parent.parent
+
+    parser = argparse.ArgumentParser(
+        description="Consulta la población procesada sin iniciar el dashboard.",
+        epilog="Ejemplo: python src/utils/query.py --year 2020 --state JALISCO --by genero,edad",
+    )
+    default_input = project_root / "data" / "processed_data" / "archivo_transformado.parquet"
+    parser.add_argument('--input', default=default_input,
+                        help="Archivo procesado o dataset particionado")
+    parser.add_argument('--year', type=int, nargs='+')
+    parser.add_argument('--state', nargs='+')
+    parser.add_argument('--age', nargs='+')
+    parser.add_argument('--gender', nargs='+')
+    parser.add_argument('--by', help="Columnas de agregación, p. ej. 'genero,edad'")
+    parser.add_argument('--columns', help="Columnas a exportar sin agregar (por omisión, todas)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    args = parser.parse_args(argv)
+
+    try:
+        by = parse_columns(args.by) if args.by else None
+        columns = parse_columns(args.columns, COLUMN_NAMES) if args.columns else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    filters = dict(years=args.year, states=args.state, ages=args.age, genders=args.gender)
+    sink = sys.stdout.buffer
+    try:
+        if by:
+            write_frame(aggregate(args.input, by, **filters), args.format, sink)
+        else:
+            scanner = scan(args.input, columns, **filters)
+            write_batches(scanner.to_batches(), scanner.projected_schema, args.format, sink)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"Error: {type(e).__name__}: {e}\n")
+    sink.flush()
+
+
+if __name__ == '__main__':
+    main()
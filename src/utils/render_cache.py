@@ -0,0 +1,122 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class RenderCache:
+    """Caché LRU de imágenes PNG ya renderizadas.
+
+    La capa en memoria está acotada por `max_bytes`. Si se indica `disk_dir`,
+    las imágenes también se guardan en disco para compartirlas entre procesos
+    del servidor; esa capa está acotada por `disk_max_bytes` y, al rebasarlo,
+    se borran los archivos con el mtime más antiguo (una lectura en disco
+    renueva el mtime, así que se comporta como LRU entre procesos).
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, disk_dir=None, disk_max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return png
+
+        png = self._read_disk(key)
+        with self._lock:
+            if png is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._store(key, png)
+        return png
+
+    def put(self, key, png):
+        self._store(key, png)
+        if self.disk_dir:
+            path = self.disk_dir / f"{key}.png"
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(png)
+            os.replace(tmp, path)  # Escritura atómica entre procesos
+            self._trim_disk()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def _store(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = png
+            self.size += len(png)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self.disk_dir / f"{key}.png"
+        try:
+            png = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:  # Otro proceso pudo borrarlo al recortar
+            return None
+        return png
+
+    def _trim_disk(self):
+        """Borra los PNG más antiguos (por mtime) hasta quedar dentro de `disk_max_bytes`."""
+        files = []
+        for path in self.disk_dir.glob('*.png'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def make_key(chart, data_version, **params):
+    """Llave de caché a partir del tipo de gráfica, la versión de datos y los filtros."""
+    payload = json.dumps([chart, data_version, params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def figure_to_png(fig):
+    """Renderiza la figura a PNG con las mismas opciones que `st.pyplot`."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=200)
+    return buffer.getvalue()
+
+
+render_cache = RenderCache(
+    max_bytes=int(os.environ.get('RENDER_CACHE_MAX_MB', 64)) * 2**20,
+    disk_dir=os.environ.get('RENDER_CACHE_DIR'),
+    disk_max_bytes=int(os.environ.get('RENDER_CACHE_DISK_MAX_MB', 256)) * 2**20,
+)
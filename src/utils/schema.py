@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+STATE = 'Entidad federativa'
+AGE = 'Grupo quinquenal de edad'
+GENDER = 'Género'
+YEAR = 'Año'
+COUNT = 'Cantidad'
+COLUMNS = [STATE, AGE, GENDER, YEAR, COUNT]
+
+AGE_ORDER = [
+    '0 a 4 años', '5 a 9 años', '10 a 14 años', '15 a 19 años',
+    '20 a 24 años', '25 a 29 años', '30 a 34 años', '35 a 39 años',
+    '40 a 44 años', '45 a 49 años', '50 a 54 años', '55 a 59 años',
+    '60 a 64 años', '65 a 69 años', '70 a 74 años', '75 a 79 años',
+    '80 a 84 años', '85 a 89 años', '90 a 94 años', '95 a 99 años',
+    '100 años y más', 'No especificado'
+]
+GENDER_ORDER = ['Hombres', 'Mujeres']
+
+YEAR_DTYPE = 'int16'
+COUNT_DTYPE = 'int32'
+
+
+def _categorical(series, order=None):
+    """Categoría ordenada; las etiquetas fuera de `order` se agregan al final."""
+    if order is None:
+        categories = sorted(pd.unique(series.dropna()))
+    else:
+        present = set(pd.unique(series.dropna()))
+        categories = list(order) + sorted(present - set(order))
+    return series.astype(pd.CategoricalDtype(categories, ordered=True))
+
+
+def ordered_labels(column, labels):
+    """Etiquetas presentes de `column` en el orden de las categorías de `enforce_schema`."""
+    order = {AGE: AGE_ORDER, GENDER: GENDER_ORDER}.get(column)
+    present = set(labels)
+    if order is None:
+        return sorted(present)
+    return [label for label in order if label in present] + sorted(present - set(order))
+
+
+def enforce_schema(df):
+    """Aplica los tipos canónicos del marco largo.
+
+    Entidad, grupo de edad y género como categorías ordenadas (las edades en
+    orden quinquenal), año como int16 y cantidad como int32. Sólo convierte
+    las columnas presentes, así que acepta marcos con proyección de columnas.
+    """
+    df = df.copy()
+    if STATE in df.columns:
+        df[STATE] = _categorical(df[STATE])
+    if AGE in df.columns:
+        df[AGE] = _categorical(df[AGE], AGE_ORDER)
+    if GENDER in df.columns:
+        df[GENDER] = _categorical(df[GENDER], GENDER_ORDER)
+    if YEAR in df.columns:
+        df[YEAR] = df[YEAR].astype(YEAR_DTYPE)
+    if COUNT in df.columns:
+        if len(df) and df[COUNT].abs().max() > np.iinfo(COUNT_DTYPE).max:
+            raise ValueError(f"'{COUNT}' excede el rango de {COUNT_DTYPE}")
+        df[COUNT] = df[COUNT].astype(COUNT_DTYPE)
+    return df
@@ -0,0 +1,192 @@
+import os
+import shutil
+from contextlib import contextmanager
+
+import pyarrow as pa
+from pathlib import Path
+
+try:
+    from utils.schema import enforce_schema
+except ImportError:  # Ejecución directa desde src/utils
+    from schema import enforce_schema
+
+DEFAULT_FORMAT = 'parquet'
+
+STORAGE_SCHEMA = pa.schema([
+    ('Entidad federativa', pa.dictionary(pa.int32(), pa.string(), ordered=True)),
+    ('Grupo quinquenal de edad', pa.dictionary(pa.int32(), pa.string(), ordered=True)),
+    ('Género', pa.dictionary(pa.int32(), pa.string(), ordered=True)),
+    ('Año', pa.int16()),
+    ('Cantidad', pa.int32()),
+])
+
+
+def _tmp_path(path):
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+@contextmanager
+def _atomic_path(path):
+    """Ruta temporal junto a `path` que lo reemplaza al terminar sin errores.
+
+    Los lectores que tienen el archivo anterior mapeado en memoria siguen
+    viendo su versión completa en lugar de un archivo truncado a medio escribir.
+    """
+    tmp = _tmp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _write_parquet(df, path):
+    with _atomic_path(path) as tmp:
+        enforce_schema(df).to_parquet(tmp, index=False, engine='pyarrow', schema=STORAGE_SCHEMA)
+
+
+def _write_feather(df, path):
+    with _atomic_path(path) as tmp:
+        enforce_schema(df).reset_index(drop=True).to_feather(tmp)
+
+
+def _write_excel(df, path):
+    df.to_excel(path, index=False)
+
+
+def _table_parquet(path, columns=None):
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    # En un dataset particionado la columna de partición queda al final
+    order = columns or [name for name in STORAGE_SCHEMA.names if name in table.column_names]
+    return table.select(order)
+
+
+def _table_feather(path, columns=None):
+    import pyarrow.feather as feather
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def _read_parquet(path, columns=None):
+    return _table_parquet(path, columns).to_pandas()
+
+
+def _read_feather(path, columns=None):
+    return _table_feather(path, columns).to_pandas()
+
+
+# Formatos de salida disponibles: nombre -> (extensiones, escritor, lector).
+# Excel sólo se ofrece como formato de exportación, no de lectura.
+FORMATS = {
+    'parquet': (('.parquet', '.pq'), _write_parquet, _read_parquet),
+    'feather': (('.feather', '.arrow'), _write_feather, _read_feather),
+    'excel': (('.xlsx',), _write_excel, None),
+}
+
+
+def detect_format(path):
+    """Determina el formato a partir de la extensión del archivo."""
+    suffix = Path(path).suffix.lower()
+    for name, (extensions, _, _) in FORMATS.items():
+        if suffix in extensions:
+            return name
+    return DEFAULT_FORMAT
+
+
+def save_processed(df, path, fmt=None):
+    """Guarda la tabla procesada en el formato indicado o deducido de la ruta."""
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    FORMATS[fmt][1](df, path)
+
+
+def load_processed(path, columns=None):
+    """Lee la tabla procesada mapeando el archivo en memoria.
+
+    `columns` permite leer sólo las columnas necesarias. El resultado tiene
+    los tipos canónicos de `utils.schema`.
+    """
+    fmt = detect_format(path)
+    reader = FORMATS[fmt][2]
+    if reader is None:
+        raise ValueError(f"El formato {fmt} sólo está disponible para exportar")
+    return enforce_schema(reader(path, columns=columns))
+
+
+def load_table(path, columns=None):
+    """Lee la tabla procesada como `pyarrow.Table` mapeada en memoria, sin convertir a pandas."""
+    fmt = detect_format(path)
+    if fmt == 'parquet':
+        return _table_parquet(path, columns)
+    if fmt == 'feather':
+        return _table_feather(path, columns)
+    raise ValueError(f"El formato {fmt} sólo está disponible para exportar")
+
+
+class ChunkWriter:
+    """Escribe la tabla procesada en Parquet por bloques (un row group por bloque).
+
+    Permite generar el archivo procesado sin tener toda la tabla en memoria.
+    El archivo final sólo aparece (reemplazando al anterior) al cerrar sin errores.
+    """
+
+    def __init__(self, path):
+        import pyarrow.parquet as pq
+        if detect_format(path) != 'parquet':
+            raise ValueError("La escritura por bloques sólo está disponible para Parquet")
+        self.rows = 0
+        self._path = Path(path)
+        self._tmp = _tmp_path(path)
+        self._writer = pq.ParquetWriter(self._tmp, STORAGE_SCHEMA)
+
+    def write(self, df):
+        table = pa.Table.from_pandas(enforce_schema(df), schema=STORAGE_SCHEMA, preserve_index=False)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        self._writer.close()
+        os.replace(self._tmp, self._path)
+
+    def discard(self):
+        self._writer.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_dataset(df, path, partition_cols):
+    """Escribe un dataset Parquet particionado (un directorio por valor).
+
+    Se escribe en un directorio temporal y luego se reemplaza el anterior,
+    para que los lectores nunca vean un dataset a medio escribir.
+    """
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    table = pa.Table.from_pandas(enforce_schema(df), schema=STORAGE_SCHEMA, preserve_index=False)
+    pq.write_to_dataset(table, tmp, partition_cols=partition_cols)
+
+    old = path.with_name(path.name + '.old')
+    shutil.rmtree(old, ignore_errors=True)
+    if path.exists():
+        path.rename(old)
+    tmp.rename(path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def export_excel(df, path):
+    """Exporta la tabla procesada a Excel."""
+    save_processed(df, path, fmt='excel')
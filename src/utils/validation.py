@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STATE_COLUMN = 'Entidad federativa'
+AGE_COLUMN = 'Grupo quinquenal de edad'
+TOTAL_LABEL = 'Total'
+NATIONAL_LABEL = 'Estados Unidos Mexicanos'
+REASON_COLUMN = 'Motivo'
+
+# Motivos de cuarentena, en el orden en que se revisan (un renglón conserva el primero)
+EMPTY_KEY = 'llave vacía'
+NOT_NUMERIC = 'cantidad no numérica'
+NEGATIVE = 'cantidad negativa'
+BAD_YEAR = 'año inconsistente'
+DUPLICATE = 'renglón duplicado'
+ROW_TOTAL = 'total del renglón'
+STATE_TOTAL = 'total de la entidad'
+
+
+def census_blocks(columns):
+    """Columnas de cada censo del libro crudo, alineadas por sufijo.
+
+    Regresa {sufijo: (total, hombres, mujeres, año)}; `total` es `None` si el
+    libro no trae la columna 'Total' del censo. Lanza `ValueError` si faltan
+    las columnas de llave o si un censo está incompleto.
+    """
+    columns = [str(col) for col in columns]
+    missing = [col for col in (STATE_COLUMN, AGE_COLUMN) if col not in columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en el libro crudo: {', '.join(missing)}")
+
+    suffixes = [col[len('Hombres'):] for col in columns if col.startswith('Hombres')]
+    if not suffixes:
+        raise ValueError("El libro crudo no tiene columnas Hombres*/Mujeres*/Año*")
+
+    blocks = {}
+    for suffix in suffixes:
+        needed = [f"Mujeres{suffix}", f"Año{suffix}"]
+        absent = [col for col in needed if col not in columns]
+        if absent:
+            raise ValueError(f"Censo incompleto 'Hombres{suffix}': faltan {', '.join(absent)}")
+        total = f"Total{suffix}" if f"Total{suffix}" in columns else None
+        blocks[suffix] = (total, f"Hombres{suffix}", *needed)
+    return blocks
+
+
+def _parse_years(column):
+    """Año (4 dígitos) de cada celda como flotante; `NaN` si no se puede leer."""
+    codes, uniques = pd.factorize(column)
+    parsed = pd.Series(uniques, dtype=object).astype(str)\
+               .str.extract(r'(\d{4})', expand=False).astype(float).to_numpy()
+    return np.where(codes >= 0, parsed[np.maximum(codes, 0)], np.nan)
+
+
+def _flag(reasons, mask, reason):
+    reasons[mask & pd.isna(reasons)] = reason
+
+
+def validate_raw(df, required_years=None, check_totals=True):
+    """Valida el libro crudo antes de remodelarlo y separa los renglones inválidos.
+
+    Todas las revisiones son operaciones sobre columnas completas:
+
+    - esquema: columnas de llave y censos completos, cada censo con un año
+      legible y distinto, e incluidos los de `required_years` (si no, se
+      detiene con `ValueError` sin remodelar nada);
+    - llaves vacías, cantidades no numéricas o negativas;
+    - años por grupo: cada renglón debe traer el año de cada censo (el más
+      frecuente de su columna), así todos los grupos tienen los mismos años;
+    - renglones duplicados (entidad, grupo de edad): se conserva el primero;
+    - totales de la fuente: 'Total' = Hombres + Mujeres en cada renglón y,
+      con `check_totals`, el renglón 'Total' de cada entidad contra la suma
+      de sus grupos de edad (si no coincide, la entidad completa va a
+      cuarentena). Las entidades con renglones ya separados no se comparan.
+
+    Los renglones de totales y los nacionales no se validan como datos (los
+    descarta `clean_raw`). Regresa (válidos, cuarentena): los válidos con las
+    cantidades como enteros y la cuarentena con los renglones originales más
+    la columna 'Motivo'.
+    """
+    blocks = census_blocks(df.columns)
+    if df.empty:
+        return df.copy(), df.assign(**{REASON_COLUMN: pd.Series(dtype=object)})
+
+    years = np.column_stack([_parse_years(df[block[3]]) for block in blocks.values()])
+    block_years = pd.DataFrame(years).mode().reindex([0]).to_numpy()[0]
+    unreadable = [block[3] for block, year in zip(blocks.values(), block_years) if np.isnan(year)]
+    if unreadable:
+        raise ValueError(f"Censos sin año legible: {', '.join(unreadable)}")
+    if len(set(block_years)) < len(block_years):
+        raise ValueError(f"Dos censos tienen el mismo año: {sorted(block_years.astype(int))}")
+    absent = sorted(set(required_years or ()) - set(block_years.astype(int)))
+    if absent:
+        raise ValueError(f"Faltan los censos requeridos: {absent}")
+
+    count_columns = [col for block in blocks.values() for col in block[:3] if col is not None]
+    counts = np.column_stack([pd.to_numeric(df[col], errors='coerce') for col in count_columns])\
+               .astype(float)
+    state = df[STATE_COLUMN]
+    age = df[AGE_COLUMN]
+    is_total = (age == TOTAL_LABEL).to_numpy()
+    is_data = ~is_total & (state != NATIONAL_LABEL).to_numpy()
+
+    reasons = np.full(len(df), None, dtype=object)
+    _flag(reasons, is_data & (state.isna() | age.isna()).to_numpy(), EMPTY_KEY)
+    _flag(reasons, is_data & ~np.isfinite(counts).all(axis=1), NOT_NUMERIC)
+    _flag(reasons, is_data & (counts < 0).any(axis=1), NEGATIVE)
+    _flag(reasons, is_data & (years != block_years).any(axis=1), BAD_YEAR)
+    _flag(reasons, is_data & df.duplicated([STATE_COLUMN, AGE_COLUMN]).to_numpy(), DUPLICATE)
+
+    position = {col: i for i, col in enumerate(count_columns)}
+    gender_columns = [position[col] for block in blocks.values() for col in block[1:3]]
+    totals = [[position[col] for col in block[:3]] for block in blocks.values() if block[0]]
+    if totals:
+        total, men, women = (list(index) for index in zip(*totals))
+        mismatch = counts[:, total] != counts[:, men] + counts[:, women]
+        _flag(reasons, is_data & mismatch.any(axis=1), ROW_TOTAL)
+
+    if check_totals:
+        codes, _ = pd.factorize(state)
+        valid = is_data & pd.isna(reasons)
+        # Sólo se comparan las entidades con un renglón 'Total' numérico y sin renglones separados
+        separated = codes[is_data & ~pd.isna(reasons)]
+        reported = pd.DataFrame(counts[is_total][:, gender_columns], index=codes[is_total])
+        reported = reported[~reported.index.duplicated() & ~reported.index.isin(separated)
+                            & np.isfinite(reported.to_numpy()).all(axis=1)]
+        summed = pd.DataFrame(counts[valid][:, gender_columns]).groupby(codes[valid]).sum()
+        summed = summed.reindex(reported.index, fill_value=0)
+        wrong = reported.index[(summed.to_numpy() != reported.to_numpy()).any(axis=1)]
+        _flag(reasons, is_data & np.isin(codes, wrong), STATE_TOTAL)
+
+    bad = ~pd.isna(reasons)
+    quarantine = df[bad].assign(**{REASON_COLUMN: reasons[bad]})
+    valid = df[~bad].copy()
+    for i, col in enumerate(count_columns):
+        column = counts[~bad, i]
+        # Los renglones de totales pueden venir vacíos; sólo los de datos se exigen completos
+        valid[col] = column.astype('int64') if np.isfinite(column).all() else column
+    return valid, quarantine
+
+
+def quarantine_path(output_path):
+    """Ruta del archivo de cuarentena junto a la salida: <nombre>_cuarentena.csv."""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}_cuarentena.csv")
+
+
+def save_quarantine(quarantine, output_path):
+    """Escribe los renglones en cuarentena (o borra el archivo de una corrida anterior).
+
+    Regresa la ruta escrita o `None` si no hubo renglones inválidos.
+    """
+    path = quarantine_path(output_path)
+    if quarantine.empty:
+        path.unlink(missing_ok=True)
+        return None
+    quarantine.to_csv(path, index=False)
+    return path
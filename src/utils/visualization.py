@@ -1,102 +1,158 @@
+import importlib.util
+import threading
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error
 
+from utils.cube import ensure_cube
+from utils.forecasting import fit_trends, future_years
+from utils.precompute import cached_rollup, cached_forecast_segments
+from utils.render_cache import render_cache, make_key, figure_to_png
+from utils.instrumentation import stage, timed
+from utils.figure_pool import figure_pool
+from utils.level_of_detail import (
+    OTHER_LABEL, needs_top_n, needs_binning, rank_windows, top_entities, bin_scatter
+)
 
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-sns.set_style("whitegrid")
 
-def plot_population_by_gender_age(df, key_suffix=""):
-    """Gráfico de barras de población por género y grupo de edad."""
-    st.subheader("Población por Género y Grupo de Edad")
+BACKENDS = ('matplotlib', 'vega')
+_style_lock = threading.Lock()
+_style_applied = False
+
+
+def available_backends():
+    """Motores de gráficas instalados; matplotlib siempre está disponible.
+
+    Sólo busca el paquete, sin importarlo, para no cargar Altair al arrancar.
+    """
+    if importlib.util.find_spec('altair') is None:
+        return ('matplotlib',)
+    return BACKENDS
+
+
+def _vega():
+    from utils import charts_vega
+    return charts_vega
+
+
+def _pyplot():
+    """Importa matplotlib y seaborn en el primer uso y aplica el estilo global una sola vez."""
+    global _style_applied
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if not _style_applied:
+        with _style_lock:
+            if not _style_applied:
+                plt.style.use('seaborn-v0_8-darkgrid')
+                sns.set_palette("husl")
+                sns.set_style("whitegrid")
+                _style_applied = True
+    return plt, sns
+
+
+def _show_cached(key):
+    """Muestra la imagen ya renderizada si existe; regresa True en ese caso."""
+    png = render_cache.get(key)
+    if png is None:
+        return False
+    st.image(png, use_column_width=True)
+    return True
 
-    orden_quinquenal = [
-        '0 a 4 años', '5 a 9 años', '10 a 14 años', '15 a 19 años',
-        '20 a 24 años', '25 a 29 años', '30 a 34 años', '35 a 39 años',
-        '40 a 44 años', '45 a 49 años', '50 a 54 años', '55 a 59 años',
-        '60 a 64 años', '65 a 69 años', '70 a 74 años', '75 a 79 años',
-        '80 a 84 años', '85 a 89 años', '90 a 94 años', '95 a 99 años',
-        '100 y más años', 'No especificado'
-    ]
+
+def _show_figure(fig, key):
+    """Renderiza la figura a PNG, la guarda en la caché y la muestra.
+
+    Las figuras vienen de `figure_pool`, que las recupera al salir del bloque
+    `with`; aquí no se cierran.
+    """
+    with stage('serialize'):
+        png = figure_to_png(fig)
+    render_cache.put(key, png)
+    with stage('send'):
+        st.image(png, use_column_width=True)
+
+
+def _show_vega(chart):
+    """Envía la especificación Vega-Lite al navegador."""
+    with stage('send'):
+        st.altair_chart(chart, use_container_width=True)
+
+
+@timed('plot.gender_age')
+def plot_population_by_gender_age(df, key_suffix="", backend="matplotlib"):
+    """Gráfico de barras de población por género y grupo de edad.
+
+    `df` puede ser un `PopulationCube` o el marco largo procesado. `backend`
+    elige entre 'matplotlib' (PNG renderizado en el servidor) y 'vega'
+    (Vega-Lite renderizado en el navegador con los datos ya agregados).
+    """
+    st.subheader("Población por Género y Grupo de Edad")
 
     try:  
-        if 'Año' in df.columns:
-            available_years = sorted(df['Año'].unique())
-            selected_year = st.selectbox(
-                "Seleccionar año",
-                options=available_years,
-                index=len(available_years)-1,
-                key=f"year_select_{key_suffix}"
-            )
-            df_filtered = df[df['Año'] == selected_year]
-        else:
-            df_filtered = df
+        cube = ensure_cube(df)
+        available_years = cube.years
+        selected_year = st.selectbox(
+            "Seleccionar año",
+            options=available_years,
+            index=len(available_years)-1,
+            key=f"year_select_{key_suffix}"
+        )
+        cube_filtered = cube.select(years=[selected_year])
 
-        if df_filtered.empty:
+        if cube_filtered.empty:
             st.warning("No hay datos disponibles para los filtros seleccionados")
             return
 
-        df_filtered['Grupo quinquenal de edad'] = pd.Categorical(
-            df_filtered['Grupo quinquenal de edad'],
-            categories=orden_quinquenal,
-            ordered=True
-        )
+        key = make_key('gender_age', cube_filtered.version)
+        if backend == 'matplotlib' and _show_cached(key):
+            return
 
-        grouped_df = df_filtered.groupby(['Género', 'Grupo quinquenal de edad'])['Cantidad']\
-                              .sum()\
-                              .reset_index()
-
-        fig, ax = plt.subplots(figsize=(14, 7))
-        sns.barplot(
-            data=grouped_df,
-            x='Grupo quinquenal de edad',
-            y='Cantidad',
-            hue='Género',
-            order=orden_quinquenal,
-            ax=ax
-        )
+        # El cubo ya conserva el orden quinquenal de `utils.schema.AGE_ORDER`
+        with stage('aggregate') as span:
+            grouped_df = cached_rollup(cube_filtered, ['Género', 'Grupo quinquenal de edad'])
+            orden_quinquenal = list(cube_filtered.axes['Grupo quinquenal de edad'])
+            span.count(len(grouped_df))
 
-        ax.set_title(
-            f"Distribución por Género y Edad ({selected_year if 'Año' in df.columns else 'Total'})",
-            pad=20,
-            fontsize=14
-        )
-        ax.set_xlabel("Grupo Quinquenal de Edad", fontsize=12)
-        ax.set_ylabel("Población Total", fontsize=12)
-        plt.xticks(rotation=90, ha='center')
-        plt.legend(title='Género', bbox_to_anchor=(1.05, 1), loc='upper left')
-
-        for p in ax.patches:
-            ax.annotate(
-                f"{int(p.get_height()):,}",
-                (p.get_x() + p.get_width()/2, p.get_height()),
-                ha='center', va='center',
-                xytext=(0, 5),
-                textcoords='offset points',
-                fontsize=8
-            )
+        if backend == 'vega':
+            _show_vega(_vega().gender_age_chart(
+                grouped_df, orden_quinquenal, f"Distribución por Género y Edad ({selected_year})"
+            ))
+            return
 
-        st.pyplot(fig)
+        genders = list(cube_filtered.axes['Género'])
+        with figure_pool.figure('gender_age', (14, 7)) as pooled:
+            if pooled.signature == (tuple(orden_quinquenal), tuple(genders)):
+                heights = grouped_df.pivot(index='Género', columns='Grupo quinquenal de edad', values='Cantidad')\
+                                    .reindex(index=genders, columns=orden_quinquenal)
+                _update_bars(pooled, heights.to_numpy().ravel())
+            else:
+                _draw_gender_age(pooled, grouped_df, orden_quinquenal, genders)
+
+            pooled.ax.set_title(
+                f"Distribución por Género y Edad ({selected_year})",
+                pad=20,
+                fontsize=14
+            )
+            _show_figure(pooled.fig, key)
 
     except Exception as e:
         st.error(f"Error al generar el gráfico: {e}")
 
-def plot_population_trend(df, key_suffix=""):
+@timed('plot.trend')
+def plot_population_trend(df, key_suffix="", backend="matplotlib"):
     """Gráfico de tendencia temporal con selector de rango de años."""
     st.subheader("Evolución Temporal de la Población")
 
-    if 'Año' not in df.columns:
+    cube = ensure_cube(df)
+    if not cube.years:
         st.warning("No hay datos temporales disponibles")
         return
 
     try:  
-        min_year = int(df['Año'].min())
-        max_year = int(df['Año'].max())
+        min_year = min(cube.years)
+        max_year = max(cube.years)
 
         selected_years = st.slider(
             "Seleccionar rango de años",
@@ -106,32 +162,44 @@ def plot_population_trend(df, key_suffix=""):
             key=f"year_range_{key_suffix}"
         )
 
-        df_filtered = df[(df['Año'] >= selected_years[0]) & (df['Año'] <= selected_years[1])]
-        trend_df = df_filtered.groupby(['Año', 'Género'])['Cantidad'].sum().reset_index()
+        key = make_key('trend', cube.version, years=selected_years)
+        if backend == 'matplotlib' and _show_cached(key):
+            return
 
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.lineplot(
-            data=trend_df,
-            x='Año',
-            y='Cantidad',
-            hue='Género',
-            style='Género',
-            markers=True,
-            dashes=False,
-            linewidth=2,
-            ax=ax
-        )
+        with stage('aggregate') as span:
+            trend_df = cached_rollup(cube.year_range(*selected_years), ['Año', 'Género'])
+            span.count(len(trend_df))
+
+        if backend == 'vega':
+            _show_vega(_vega().trend_chart(
+                trend_df, f"Tendencia Poblacional ({selected_years[0]}-{selected_years[1]})"
+            ))
+            return
+
+        genders = list(cube.axes['Género'])
+        with figure_pool.figure('trend', (12, 6)) as pooled:
+            if pooled.signature == tuple(genders):
+                series = trend_df.pivot(index='Año', columns='Género', values='Cantidad')
+                for line, gender in zip(pooled.artists['lines'], genders):
+                    line.set_data(series.index, series[gender])
+                pooled.ax.relim()
+                pooled.ax.autoscale_view()
+            else:
+                _draw_trend(pooled, trend_df, genders)
 
-        ax.set_title(f"Tendencia Poblacional ({selected_years[0]}-{selected_years[1]})", pad=20)
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
+            pooled.ax.set_title(f"Tendencia Poblacional ({selected_years[0]}-{selected_years[1]})", pad=20)
+            _show_figure(pooled.fig, key)
 
     except Exception as e:
         st.error(f"Error al generar el gráfico: {e}")
 
-def plot_population_by_state(df, key_suffix=""):
-    """Gráfico de barras horizontales para población por estado."""
+@timed('plot.by_state')
+def plot_population_by_state(df, key_suffix="", backend="matplotlib"):
+    """Gráfico de barras horizontales para población por estado.
+
+    Con muchas entidades (ver `utils.level_of_detail`) muestra una ventana
+    del ranking más una barra 'Otras'; el selector recorre el ranking.
+    """
     st.subheader("Distribución por Entidad Federativa")
 
     try:  
@@ -140,46 +208,54 @@ def plot_population_by_state(df, key_suffix=""):
             key=f"log_scale_{key_suffix}"
         )
 
-        state_data = df.groupby('Entidad federativa')['Cantidad']\
-                    .sum()\
-                    .sort_values(ascending=False)\
-                    .reset_index()
-
-        fig, ax = plt.subplots(figsize=(14, 10))
-        sns.barplot(
-            x='Cantidad',
-            y='Entidad federativa',
-            data=state_data,
-            orient='h',
-            palette="viridis",
-            ax=ax
-        )
-
-        if use_log:
-            ax.set_xscale('log')
-            ax.set_xlabel("Población (Escala Logarítmica)")
-        else:
-            ax.set_xlabel("Población Total")
-
-        for p in ax.patches:
-            width = p.get_width()
-            ax.annotate(
-                f'{width:,.0f}',
-                (width * 1.02, p.get_y() + p.get_height()/2),
-                va='center',
-                fontsize=8
+        cube = ensure_cube(df)
+        states = len(cube.axes['Entidad federativa'])
+        start = 0
+        if needs_top_n(states):
+            start, _ = st.selectbox(
+                "Entidades mostradas (de mayor a menor población)",
+                options=rank_windows(states),
+                format_func=lambda window: f"{window[0] + 1:,}–{window[1]:,} de {states:,}",
+                key=f"state_window_{key_suffix}"
             )
+            st.caption(f"Las demás entidades se suman en la barra '{OTHER_LABEL}'.")
+
+        key = make_key('by_state', cube.version, log=use_log, start=start)
+        if backend == 'matplotlib' and _show_cached(key):
+            return
+
+        with stage('aggregate') as span:
+            state_data = cached_rollup(cube, ['Entidad federativa'])\
+                        .sort_values('Cantidad', ascending=False)
+            if needs_top_n(states):
+                state_data = top_entities(state_data, start)
+            span.count(len(state_data))
+
+        if backend == 'vega':
+            _show_vega(_vega().state_chart(state_data, use_log))
+            return
 
-        ax.set_title("Distribución por Estado", pad=20)
-        ax.set_ylabel("")
-        plt.tight_layout()
-        st.pyplot(fig)
+        with figure_pool.figure('by_state', (14, 10)) as pooled:
+            if pooled.signature == _state_signature(state_data, use_log):
+                _update_state_bars(pooled, state_data)
+            else:
+                _draw_by_state(pooled, state_data, use_log)
+            if _has_other(state_data) and not use_log:
+                _fit_other(pooled)
+
+            pooled.fig.tight_layout()
+            _show_figure(pooled.fig, key)
 
     except Exception as e:
         st.error(f"Error al generar el gráfico: {e}")
 
-def plot_population_scatter(df, key_suffix=""):
-    """Gráfico de dispersión comparando población por género."""
+@timed('plot.scatter')
+def plot_population_scatter(df, key_suffix="", backend="matplotlib"):
+    """Gráfico de dispersión comparando población por género.
+
+    Con muchas entidades (ver `utils.level_of_detail`) dibuja celdas
+    coloreadas por el número de entidades en lugar de un punto por entidad.
+    """
     st.subheader("Relación Poblacional Hombres vs Mujeres")
 
     try:  
@@ -188,115 +264,200 @@ def plot_population_scatter(df, key_suffix=""):
             key=f"log_scatter_{key_suffix}"
         )
 
-        pivot_df = df.groupby(['Entidad federativa', 'Género'])['Cantidad']\
-                   .sum()\
-                   .unstack()\
-                   .fillna(0)
+        cube = ensure_cube(df)
+        states = len(cube.axes['Entidad federativa'])
+        if needs_binning(states):
+            st.caption(f"{states:,} entidades agrupadas en celdas; "
+                       "el color indica cuántas hay en cada una.")
 
-        fig, ax = plt.subplots(figsize=(10, 8))
-        sns.scatterplot(
-            data=pivot_df,
-            x='Hombres',
-            y='Mujeres',
-            s=100,
-            alpha=0.7,
-            edgecolor='k',
-            ax=ax
-        )
-        max_val = max(pivot_df.max().max(), 1)
-        ax.plot([0, max_val], [0, max_val], 'r--', alpha=0.5, label="Línea de Referencia") # Added label
+        key = make_key('scatter', cube.version, log=log_scale)
+        if backend == 'matplotlib' and _show_cached(key):
+            return
 
-        if log_scale:
-            ax.set_xscale('log')
-            ax.set_yscale('log')
+        with stage('aggregate') as span:
+            pivot_df = cached_rollup(cube, ['Entidad federativa', 'Género'])\
+                       .pivot(index='Entidad federativa', columns='Género', values='Cantidad')
+            span.count(len(pivot_df))
+
+        if needs_binning(states):
+            with stage('bin'):
+                edges, counts = bin_scatter(pivot_df, log_scale)
+            if backend == 'vega':
+                _show_vega(_vega().binned_scatter_chart(edges, counts, log_scale))
+                return
+            with figure_pool.figure('scatter_binned', (10, 8)) as pooled:
+                _draw_binned_scatter(pooled, edges, counts, log_scale)
+                _show_figure(pooled.fig, key)
+            return
+
+        if backend == 'vega':
+            _show_vega(_vega().scatter_chart(pivot_df, log_scale))
+            return
 
-        ax.set_title("Correlación por Género", pad=20)
-        ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
-        ax.legend() 
-        st.pyplot(fig)
+        max_val = max(pivot_df.max().max(), 1)
+        with figure_pool.figure('scatter', (10, 8)) as pooled:
+            if pooled.signature == log_scale:
+                offsets = pivot_df[['Hombres', 'Mujeres']].to_numpy()
+                pooled.artists['points'].set_offsets(offsets)
+                pooled.artists['reference'].set_data([0, max_val], [0, max_val])
+                pooled.ax.relim()
+                pooled.ax.update_datalim(offsets)  # `relim` no considera colecciones
+                pooled.ax.autoscale_view()
+            else:
+                _draw_scatter(pooled, pivot_df, max_val, log_scale)
+            _show_figure(pooled.fig, key)
 
     except Exception as e:
         st.error(f"Error al generar el gráfico: {e}")
 
 
-def plot_population_pie(df, key_suffix=""):
+@timed('plot.pie')
+def plot_population_pie(df, key_suffix="", backend="matplotlib"):
     """Gráfico de distribución por género con selector de año."""
     st.subheader("Distribución por Género")
 
     try:  
-        if 'Año' in df.columns:
-            selected_year = st.selectbox(
-                "Seleccionar año",
-                options=sorted(df['Año'].unique()),
-                key=f"pie_year_{key_suffix}"
-            )
-            df_filtered = df[df['Año'] == selected_year]
-        else:
-            df_filtered = df
+        cube = ensure_cube(df)
+        selected_year = st.selectbox(
+            "Seleccionar año",
+            options=cube.years,
+            key=f"pie_year_{key_suffix}"
+        )
+        cube_year = cube.select(years=[selected_year])
+        key = make_key('pie', cube_year.version)
+        if backend == 'matplotlib' and _show_cached(key):
+            return
 
-        gender_data = df_filtered.groupby('Género')['Cantidad'].sum()
+        with stage('aggregate') as span:
+            gender_data = cached_rollup(cube_year, ['Género'])\
+                              .set_index('Género')['Cantidad']
+            span.count(len(gender_data))
 
         if gender_data.empty:
             st.warning("No hay datos disponibles")
             return
 
-        fig, ax = plt.subplots(figsize=(8, 8))
-        wedges, texts, autotexts = ax.pie(
-            gender_data,
-            labels=gender_data.index,
-            autopct=lambda p: f'{p:.1f}%\n({p*sum(gender_data)/100:,.0f})',
-            startangle=90,
-            wedgeprops={'width': 0.3, 'edgecolor': 'w'},
-            colors=['#66b3ff', '#ffcc99'],
-            textprops={'fontsize': 12}
-        )
+        if backend == 'vega':
+            _show_vega(_vega().pie_chart(
+                gender_data, f"Distribución por Género ({selected_year})"
+            ))
+            return
 
-        ax.set_title(
-            f"Distribución por Género ({selected_year if 'Año' in df.columns else 'Total'})",
-            pad=20
-        )
-        plt.legend(
-            wedges,
-            gender_data.index,
-            title="Género",
-            loc="center left",
-            bbox_to_anchor=(1, 0.5)
-        )
-        st.pyplot(fig)
+        with figure_pool.figure('pie', (8, 8)) as pooled:
+            pooled.reset()
+            ax = pooled.ax
+            wedges, texts, autotexts = ax.pie(
+                gender_data,
+                labels=gender_data.index,
+                autopct=lambda p: f'{p:.1f}%\n({p*sum(gender_data)/100:,.0f})',
+                startangle=90,
+                wedgeprops={'width': 0.3, 'edgecolor': 'w'},
+                colors=['#66b3ff', '#ffcc99'],
+                textprops={'fontsize': 12}
+            )
+
+            ax.set_title(
+                f"Distribución por Género ({selected_year})",
+                pad=20
+            )
+            ax.legend(
+                wedges,
+                gender_data.index,
+                title="Género",
+                loc="center left",
+                bbox_to_anchor=(1, 0.5)
+            )
+            _show_figure(pooled.fig, key)
 
     except Exception as e:
         st.error(f"Error al generar el gráfico: {e}")
 
-def forecast_population_quinquenal(df, key_suffix=""):
-    """Pronóstico quinquenal usando regresión lineal."""
+@timed('plot.forecast')
+def forecast_population_quinquenal(df, key_suffix="", backend="matplotlib"):
+    """Pronóstico quinquenal por segmento usando regresión lineal en lote."""
     st.subheader("Pronóstico Poblacional")
 
     try:  
-        if 'Año' not in df.columns:
+        cube = ensure_cube(df)
+        if not cube.years:
             st.warning("Se requieren datos temporales")
             return
 
-        if len(df['Año'].unique()) < 3:
+        if len(cube.years) < 3:
             st.warning("Se necesitan mínimo 3 periodos (15 años)")
             return
 
-        historical = df.groupby('Año')['Cantidad'].sum().reset_index()
-        min_year = historical['Año'].min()
-        historical['Periodo'] = (historical['Año'] - min_year) // 5
-
-        if not all(historical['Año'].diff().dropna() % 5 == 0):
+        years = np.array(cube.years)
+        if not all(np.diff(years) % 5 == 0):
             st.error("Los datos no son quinquenales")
             return
 
-        model = LinearRegression()
-        model.fit(historical[['Periodo']], historical['Cantidad'])
+        horizons = st.slider(
+            "Quinquenios a proyectar",
+            min_value=1,
+            max_value=6,
+            value=1,
+            key=f"forecast_horizon_{key_suffix}"
+        )
 
-        last_period = historical['Periodo'].max()
-        forecast_year = historical['Año'].max() + 5
-        forecast_value = model.predict([[last_period + 1]])[0]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            state = st.selectbox("Entidad", ['Todas'] + list(cube.axes['Entidad federativa']),
+                                 key=f"forecast_state_{key_suffix}")
+        with col2:
+            age = st.selectbox("Grupo de edad", ['Todos'] + list(cube.axes['Grupo quinquenal de edad']),
+                               key=f"forecast_age_{key_suffix}")
+        with col3:
+            gender = st.selectbox("Género", ['Ambos'] + list(cube.axes['Género']),
+                                  key=f"forecast_gender_{key_suffix}")
+
+        segment = cube.select(
+            states=None if state == 'Todas' else [state],
+            ages=None if age == 'Todos' else [age],
+            genders=None if gender == 'Ambos' else [gender]
+        )
+        with stage('fit') as span:
+            historical = cached_rollup(segment, ['Año'])
+            targets = future_years(years, horizons)
+            projected, _, mae = fit_trends(historical['Cantidad'].to_numpy(), years, targets)
+            forecast = pd.DataFrame({'Año': targets, 'Cantidad': projected[0]})
+            span.count(len(historical))
+
+        if backend == 'vega':
+            _show_vega(_vega().forecast_chart(historical, forecast))
+        else:
+            key = make_key('forecast', segment.version, horizons=horizons)
+            if not _show_cached(key):
+                _draw_forecast(historical, forecast, key)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric(f"Pronóstico {targets[-1]}", f"{forecast['Cantidad'].iloc[-1]:,.0f}")
+        with col2:
+            st.metric("Error Medio Absoluto", f"{mae[0]:,.0f}")
+
+        with st.expander("Proyecciones por segmento"):
+            with stage('segments') as span:
+                projections = cached_forecast_segments(cube, horizons)
+                span.count(len(projections))
+            st.download_button(
+                "Descargar proyecciones (CSV)",
+                projections.to_csv(index=False).encode('utf-8'),
+                file_name="proyecciones_por_segmento.csv",
+                mime="text/csv",
+                key=f"forecast_download_{key_suffix}"
+            )
+
+    except Exception as e:
+        st.error(f"Error al generar el gráfico: {e}")
 
-        fig, ax = plt.subplots(figsize=(10, 6))
+
+def _draw_forecast(historical, forecast, key):
+    """Dibuja la serie histórica y los puntos pronosticados (siempre desde cero)."""
+    plt, sns = _pyplot()
+    with figure_pool.figure('forecast', (10, 6)) as pooled:
+        pooled.reset()
+        ax = pooled.ax
 
         sns.lineplot(
             x=historical['Año'],
@@ -307,11 +468,12 @@ def forecast_population_quinquenal(df, key_suffix=""):
         )
 
         ax.scatter(
-            [forecast_year],
-            [forecast_value],
+            forecast['Año'],
+            forecast['Cantidad'],
             color='red',
             s=100,
-            label='Pronóstico 2025'
+            label=f"Pronóstico {forecast['Año'].iloc[0]}-{forecast['Año'].iloc[-1]}"
+                  if len(forecast) > 1 else f"Pronóstico {forecast['Año'].iloc[0]}"
         )
 
         ax.set_title("Proyección Quinquenal", pad=20)
@@ -321,16 +483,208 @@ def forecast_population_quinquenal(df, key_suffix=""):
         ax.legend()
         ax.grid(True, alpha=0.3)
 
-        st.pyplot(fig)
-
-        y_pred = model.predict(historical[['Periodo']])
-        mae = mean_absolute_error(historical['Cantidad'], y_pred)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Pronóstico 2025", f"{forecast_value:,.0f}")
-        with col2:
-            st.metric("Error Medio Absoluto", f"{mae:,.0f}")
-
-    except Exception as e:
-        st.error(f"Error al generar el gráfico: {e}")
\ No newline at end of file
+        _show_figure(pooled.fig, key)
+
+
+def _draw_gender_age(pooled, grouped_df, order, genders):
+    """Dibuja desde cero las barras por grupo de edad y género."""
+    plt, sns = _pyplot()
+    pooled.reset()
+    ax = pooled.ax
+    sns.barplot(
+        data=grouped_df,
+        x='Grupo quinquenal de edad',
+        y='Cantidad',
+        hue='Género',
+        order=order,
+        hue_order=genders,
+        errorbar=None,
+        ax=ax
+    )
+
+    ax.set_xlabel("Grupo Quinquenal de Edad", fontsize=12)
+    ax.set_ylabel("Población Total", fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=90, ha='center')
+    ax.legend(title='Género', bbox_to_anchor=(1.05, 1), loc='upper left')
+
+    pooled.artists['labels'] = [
+        ax.annotate(
+            f"{int(p.get_height()):,}",
+            (p.get_x() + p.get_width()/2, p.get_height()),
+            ha='center', va='center',
+            xytext=(0, 5),
+            textcoords='offset points',
+            fontsize=8
+        )
+        for p in ax.patches
+    ]
+    pooled.signature = (tuple(order), tuple(genders))
+
+
+def _update_bars(pooled, heights):
+    """Cambia en su lugar la altura y la etiqueta de cada barra vertical."""
+    for patch, label, height in zip(pooled.ax.patches, pooled.artists['labels'], heights):
+        patch.set_height(height)
+        label.set_text(f"{int(height):,}")
+        label.xy = (patch.get_x() + patch.get_width()/2, height)
+    pooled.ax.relim()
+    pooled.ax.autoscale_view(scalex=False)  # El eje categórico lo fija seaborn
+
+
+def _draw_trend(pooled, trend_df, genders):
+    """Dibuja desde cero las líneas de tendencia por género."""
+    plt, sns = _pyplot()
+    pooled.reset()
+    ax = pooled.ax
+    sns.lineplot(
+        data=trend_df,
+        x='Año',
+        y='Cantidad',
+        hue='Género',
+        style='Género',
+        hue_order=genders,
+        style_order=genders,
+        markers=True,
+        dashes=False,
+        linewidth=2,
+        ax=ax
+    )
+
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+    ax.tick_params(axis='x', labelrotation=45)
+    # seaborn agrega líneas vacías para la leyenda; sólo se actualizan las de datos
+    pooled.artists['lines'] = [line for line in ax.lines if len(line.get_xdata())]
+    pooled.signature = tuple(genders)
+
+
+def _draw_by_state(pooled, state_data, use_log):
+    """Dibuja desde cero las barras horizontales por entidad."""
+    plt, sns = _pyplot()
+    pooled.reset()
+    ax = pooled.ax
+    sns.barplot(
+        x='Cantidad',
+        y='Entidad federativa',
+        data=state_data,
+        orient='h',
+        palette="viridis",
+        errorbar=None,
+        ax=ax
+    )
+
+    if use_log:
+        ax.set_xscale('log')
+        ax.set_xlabel("Población (Escala Logarítmica)")
+    else:
+        ax.set_xlabel("Población Total")
+
+    pooled.artists['labels'] = [
+        ax.annotate(
+            f'{p.get_width():,.0f}',
+            (p.get_width() * 1.02, p.get_y() + p.get_height()/2),
+            va='center',
+            fontsize=8
+        )
+        for p in ax.patches
+    ]
+    if _has_other(state_data):
+        ax.patches[-1].set_color('0.6')
+
+    ax.set_title("Distribución por Estado", pad=20)
+    ax.set_ylabel("")
+    pooled.signature = _state_signature(state_data, use_log)
+
+
+def _has_other(state_data):
+    return len(state_data) > 0 and str(state_data['Entidad federativa'].iloc[-1])\
+        .startswith(OTHER_LABEL)
+
+
+def _fit_other(pooled):
+    """Ajusta el eje a las barras de la ventana; la barra 'Otras' se corta y su etiqueta va dentro."""
+    ax = pooled.ax
+    right = max(p.get_width() for p in ax.patches[:-1]) * 1.15
+    ax.set_xlim(0, right)
+    label = pooled.artists['labels'][-1]
+    label.xy = label.xyann = (right * 0.99, label.xy[1])
+    label.set_horizontalalignment('right')
+    label.set_color('white')
+
+
+def _state_signature(state_data, use_log):
+    """Estructura de la gráfica por entidad: barras, escala y si la última es 'Otras'."""
+    return len(state_data), use_log, _has_other(state_data)
+
+
+def _update_state_bars(pooled, state_data):
+    """Cambia en su lugar el ancho, la etiqueta y el nombre de cada barra horizontal."""
+    ax = pooled.ax
+    widths = state_data['Cantidad'].to_numpy()
+    for patch, label, width in zip(ax.patches, pooled.artists['labels'], widths):
+        patch.set_width(width)
+        label.set_text(f'{width:,.0f}')
+        # Sin `xytext` el texto se coloca en `xyann`, que no sigue a `xy`
+        label.xy = label.xyann = (width * 1.02, patch.get_y() + patch.get_height()/2)
+    ax.set_yticks(range(len(state_data)), state_data['Entidad federativa'])
+    ax.relim()
+    ax.autoscale_view(scaley=False)  # El eje categórico lo fija seaborn
+
+
+def _draw_scatter(pooled, pivot_df, max_val, log_scale):
+    """Dibuja desde cero la dispersión Hombres vs Mujeres."""
+    plt, sns = _pyplot()
+    pooled.reset()
+    ax = pooled.ax
+    sns.scatterplot(
+        data=pivot_df,
+        x='Hombres',
+        y='Mujeres',
+        s=100,
+        alpha=0.7,
+        edgecolor='k',
+        ax=ax
+    )
+    reference, = ax.plot([0, max_val], [0, max_val], 'r--', alpha=0.5, label="Línea de Referencia")
+
+    if log_scale:
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+
+    ax.set_title("Correlación por Género", pad=20)
+    ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+    ax.legend()
+
+    pooled.artists['points'] = ax.collections[0]
+    pooled.artists['reference'] = reference
+    pooled.signature = log_scale
+
+
+def _draw_binned_scatter(pooled, edges, counts, log_scale):
+    """Dibuja la dispersión agrupada: una celda por par de bordes con su número de entidades."""
+    plt, sns = _pyplot()
+    pooled.reset()
+    ax = pooled.ax
+    mesh = ax.pcolormesh(edges, edges, np.ma.masked_equal(counts.T, 0), cmap='viridis')
+    pooled.fig.colorbar(mesh, ax=ax, label="Entidades")
+    ax.plot([edges[0], edges[-1]], [edges[0], edges[-1]], 'r--', alpha=0.5,
+            label="Línea de Referencia")
+
+    if log_scale:
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+    else:
+        # La barra de color angosta el eje: menos marcas para que no se encimen
+        ax.xaxis.set_major_locator(plt.MaxNLocator(5))
+
+    ax.set_xlabel("Hombres")
+    ax.set_ylabel("Mujeres")
+    ax.set_title("Correlación por Género", pad=20)
+    ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+    if log_scale:
+        # Con menos de una década entre bordes las marcas etiquetadas son las menores
+        ax.xaxis.set_minor_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+        ax.yaxis.set_minor_formatter(plt.FuncFormatter(lambda x, _: f"{x:,.0f}"))
+        ax.tick_params(axis='x', which='both', labelrotation=30)
+    ax.legend()